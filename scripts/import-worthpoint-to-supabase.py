@@ -7,83 +7,230 @@ Usage:
 
 Reads the merged CSV and inserts monthly median prices into Supabase.
 Uses direct REST API calls to avoid Python package architecture issues.
+
+If SUPABASE_DB_URL (a Postgres connection string) is set and psycopg is
+installed, rows are bulk-loaded with COPY instead, falling back to REST.
 """
 
 import csv
 import os
 import json
+import threading
+import http.client
 from collections import defaultdict
-import statistics
-import urllib.request
-import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 
 # Configuration
 SUPABASE_URL = os.environ.get("NEXT_PUBLIC_SUPABASE_URL", "")
 SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "")
+SUPABASE_DB_URL = os.environ.get("SUPABASE_DB_URL", "")  # optional, enables COPY
 
 CSV_FILE = os.path.expanduser("~/lithos/scripts/worthpoint-data/worthpoint-all-materials.csv")
 
+BATCH_SIZE = 5000  # rows per insert; halved automatically on 413/send timeout
+MAX_WORKERS = 4  # concurrent insert requests
+REQUEST_TIMEOUT = 60  # seconds
+
+# One keep-alive connection per worker thread
+_thread_local = threading.local()
+
+# Compact separators and raw UTF-8 - same bytes orjson would produce, smaller than json.dumps defaults
+_json_encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
 
-def load_merged_csv() -> list[dict]:
-    """Load the merged WorthPoint CSV file."""
+def load_merged_csv() -> list[tuple[str, str, float]]:
+    """
+    Load the merged WorthPoint CSV file.
+    Returns (material_slug, sale_date, price_per_gram) tuples.
+    """
     records = []
-    with open(CSV_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+    with open(CSV_FILE, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        try:
+            i_slug = header.index('material_slug')
+            i_ppg = header.index('price_per_gram')
+            i_date = header.index('sale_date')
+        except ValueError as e:
+            print(f"  Missing column in {CSV_FILE}: {e}")
+            return records
+        width = max(i_slug, i_ppg, i_date) + 1
+
         for row in reader:
+            if len(row) < width:
+                continue
+            ppg_str = row[i_ppg]
+            sale_date = row[i_date]
             # Only include rows with price_per_gram and sale_date
-            if not row.get('price_per_gram') or not row.get('sale_date'):
+            if not ppg_str or not sale_date:
                 continue
 
             try:
-                ppg = float(row['price_per_gram'])
-                # Sanity check - skip extreme outliers
-                if ppg <= 0 or ppg > 50000:
-                    continue
-
-                records.append({
-                    'material_slug': row['material_slug'],
-                    'price_per_gram': ppg,
-                    'sale_date': row['sale_date'],
-                })
-            except (ValueError, KeyError):
+                ppg = float(ppg_str)
+            except ValueError:
                 continue
+            # Sanity check - skip extreme outliers
+            if 0 < ppg <= 50000:
+                records.append((row[i_slug], sale_date, ppg))
 
     return records
 
 
-def calculate_monthly_medians(records: list[dict]) -> list[dict]:
+def median_in_place(values: list[float]) -> float:
+    """Median of a non-empty list; sorts the list in place instead of copying it."""
+    values.sort()
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2
+
+
+def calculate_monthly_medians(records: list[tuple[str, str, float]]) -> list[dict]:
     """
     Aggregate to monthly median prices.
     Returns one record per material per month.
     """
     # Group by (material, year-month)
     grouped = defaultdict(list)
-    for r in records:
-        date = r['sale_date']
-        if date and len(date) >= 7:
+    for slug, date, ppg in records:
+        if len(date) >= 7:
             month_key = date[:7]  # YYYY-MM
-            key = (r['material_slug'], month_key)
-            grouped[key].append(r['price_per_gram'])
+            grouped[(slug, month_key)].append(ppg)
 
     # Calculate medians
     aggregated = []
     for (slug, month), prices in sorted(grouped.items()):
-        if prices:
-            median_price = statistics.median(prices)
-            aggregated.append({
-                'material_slug': slug,
-                'price_usd': round(median_price, 2),
-                'price_per': 'gram',
-                'source': f'WorthPoint (n={len(prices)})',
-                'recorded_at': f"{month}-15",  # Mid-month
-            })
+        aggregated.append({
+            'material_slug': slug,
+            'price_usd': round(median_in_place(prices), 2),
+            'price_per': 'gram',
+            'source': f'WorthPoint (n={len(prices)})',
+            'recorded_at': f"{month}-15",  # Mid-month
+        })
 
     return aggregated
 
 
-def insert_to_supabase(records: list[dict]) -> tuple[int, int]:
-    """Insert records using Supabase REST API directly."""
-    url = f"{SUPABASE_URL}/rest/v1/lithos_prices"
+def _get_connection(endpoint) -> http.client.HTTPConnection:
+    """Return this thread's keep-alive connection, opening it on first use."""
+    conn = getattr(_thread_local, "conn", None)
+    if conn is None:
+        conn_class = http.client.HTTPSConnection if endpoint.scheme == "https" else http.client.HTTPConnection
+        conn = conn_class(endpoint.netloc, timeout=REQUEST_TIMEOUT)
+        _thread_local.conn = conn
+    return conn
+
+
+def encode_json(rows: list[dict]) -> bytes:
+    """Serialize rows to a compact JSON request body."""
+    return _json_encoder.encode(rows).encode('utf-8')
+
+
+class ResponseTimeout(Exception):
+    """The request was sent but no response arrived in time; it may have been applied."""
+
+
+def _send(conn: http.client.HTTPConnection, endpoint, headers: dict, payload: bytes) -> None:
+    """Send one POST request."""
+    conn.request("POST", endpoint.path, body=payload, headers=headers)
+
+
+def post_json(endpoint, headers: dict, payload: bytes) -> tuple[int, str]:
+    """
+    POST a JSON payload over a reused connection. Returns (status, body).
+
+    The POST is only re-sent when a reused keep-alive socket turns out to have
+    been closed by the server before any response arrived, so the rows were
+    never processed. A timeout after the body was sent raises ResponseTimeout,
+    since the insert may already have committed. On any error the connection
+    is closed before re-raising, so the thread's next call starts fresh.
+    """
+    conn = _get_connection(endpoint)
+    reused = conn.sock is not None
+    sent = False
+    try:
+        try:
+            _send(conn, endpoint, headers, payload)
+            sent = True
+            response = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            if not reused:
+                raise
+            # Server closed the idle keep-alive socket - reconnect once
+            conn.close()
+            sent = False
+            _send(conn, endpoint, headers, payload)
+            sent = True
+            response = conn.getresponse()
+        return response.status, response.read().decode('utf-8', 'replace')
+    except TimeoutError:
+        conn.close()
+        if sent:
+            raise ResponseTimeout("timed out waiting for a response") from None
+        raise
+    except (OSError, http.client.HTTPException):
+        # Connection is mid-request or mid-body; drop it so the next call reconnects
+        conn.close()
+        raise
+
+
+def insert_batch(endpoint, headers: dict, batch: list[dict]) -> tuple[int, list[str], list[str]]:
+    """
+    Insert one batch. Returns (inserted, batch_errors, record_errors).
+
+    Oversized batches (413 or a timeout while sending) are halved and retried
+    on a fresh connection. A batch that was sent but got no response, or hit
+    any other transport error, fails once and is reported rather than re-sent,
+    since it may already be in the table. A 400 means a row failed
+    validation, so the batch is retried one record at a time.
+    """
+    timed_out = False
+    try:
+        status, body = post_json(endpoint, headers, encode_json(batch))
+    except TimeoutError:
+        status, body, timed_out = None, "request timed out", True
+    except ResponseTimeout as e:
+        return 0, [f"{e}; rows may have been inserted, not retried"], []
+    except (OSError, http.client.HTTPException) as e:
+        return 0, [f"request failed: {e!r}"], []
+
+    if status is not None and status < 400:
+        return len(batch), [], []
+
+    too_large = timed_out or status == 413 or "payload too large" in body.lower()
+    if too_large and len(batch) > 1:
+        mid = len(batch) // 2
+        first = insert_batch(endpoint, headers, batch[:mid])
+        second = insert_batch(endpoint, headers, batch[mid:])
+        return first[0] + second[0], first[1] + second[1], first[2] + second[2]
+
+    batch_errors = [body[:200]]
+    if status != 400:
+        return 0, batch_errors, []
+
+    # Try individual inserts to isolate the invalid rows
+    inserted = 0
+    record_errors = []
+    for record in batch:
+        try:
+            status, record_body = post_json(endpoint, headers, encode_json([record]))
+            if status < 400:
+                inserted += 1
+            else:
+                record_errors.append(f"HTTP {status}: {record_body[:200]}")
+        except Exception as e:
+            record_errors.append(str(e))
+    return inserted, batch_errors, record_errors
+
+
+def insert_to_supabase(records: list[dict], batch_size: int = BATCH_SIZE) -> tuple[int, int]:
+    """
+    Insert records using Supabase REST API directly.
+    Batches are posted concurrently; each worker thread reuses one keep-alive
+    connection, so the TLS handshake is paid once per thread, not per batch.
+    """
+    endpoint = urlsplit(f"{SUPABASE_URL}/rest/v1/lithos_prices")
     headers = {
         "apikey": SUPABASE_KEY,
         "Authorization": f"Bearer {SUPABASE_KEY}",
@@ -93,37 +240,48 @@ def insert_to_supabase(records: list[dict]) -> tuple[int, int]:
 
     inserted = 0
     errors = 0
-    batch_size = 100
+    shown_errors = 0
+    batches = [records[i:i+batch_size] for i in range(0, len(records), batch_size)]
 
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i+batch_size]
-        try:
-            data = json.dumps(batch).encode('utf-8')
-            req = urllib.request.Request(url, data=data, headers=headers, method='POST')
-            with urllib.request.urlopen(req) as response:
-                inserted += len(batch)
-                print(f"  Inserted batch {i//batch_size + 1}: {len(batch)} records")
-        except urllib.error.HTTPError as e:
-            # Try individual inserts on batch failure
-            error_body = e.read().decode('utf-8') if e.fp else str(e)
-            print(f"  Batch error: {error_body[:200]}")
-            for record in batch:
-                try:
-                    data = json.dumps([record]).encode('utf-8')
-                    req = urllib.request.Request(url, data=data, headers=headers, method='POST')
-                    with urllib.request.urlopen(req):
-                        inserted += 1
-                except Exception as e2:
-                    errors += 1
-                    if errors <= 5:
-                        print(f"  Error: {e2}")
-        except Exception as e:
-            print(f"  Unexpected error: {e}")
-            errors += len(batch)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(insert_batch, endpoint, headers, batch) for batch in batches]
+        for batch_num, (batch, future) in enumerate(zip(batches, futures), 1):
+            try:
+                batch_inserted, batch_errors, record_errors = future.result()
+            except Exception as e:
+                print(f"  Unexpected error: {e}")
+                errors += len(batch)
+                continue
+
+            for message in batch_errors:
+                print(f"  Batch error: {message}")
+            for message in record_errors:
+                shown_errors += 1
+                if shown_errors <= 5:
+                    print(f"  Error: {message}")
+            if batch_inserted:
+                print(f"  Inserted batch {batch_num}: {batch_inserted} records")
+            inserted += batch_inserted
+            errors += len(batch) - batch_inserted
 
     return inserted, errors
 
 
+def copy_to_postgres(records: list[dict], dsn: str) -> int:
+    """
+    Bulk-load records with a single COPY over a direct Postgres connection.
+    Runs in one transaction, so either every row lands or none do.
+    """
+    import psycopg  # optional dependency, only needed for this path
+
+    columns = ('material_slug', 'price_usd', 'price_per', 'source', 'recorded_at')
+    with psycopg.connect(dsn) as conn, conn.cursor() as cur:
+        with cur.copy(f"COPY lithos_prices ({', '.join(columns)}) FROM STDIN") as copy:
+            for r in records:
+                copy.write_row(tuple(r[c] for c in columns))
+    return len(records)
+
+
 def main():
     print("=" * 60)
     print("WORTHPOINT -> SUPABASE IMPORT")
@@ -160,9 +318,22 @@ def main():
     for mat, count in sorted(material_counts.items()):
         print(f"    {mat}: {count}")
 
-    # Insert records via REST API
-    print(f"\nInserting {len(aggregated)} records via REST API...")
-    inserted, errors = insert_to_supabase(aggregated)
+    inserted = None
+    errors = 0
+    if SUPABASE_DB_URL:
+        print(f"\nCopying {len(aggregated)} records via Postgres COPY...")
+        try:
+            inserted = copy_to_postgres(aggregated, SUPABASE_DB_URL)
+        except ImportError:
+            print("  psycopg not installed (pip install 'psycopg[binary]') - using REST API")
+        except Exception as e:
+            print(f"  COPY failed, nothing inserted: {e}")
+            print("  Falling back to REST API")
+
+    if inserted is None:
+        # Insert records via REST API
+        print(f"\nInserting {len(aggregated)} records via REST API...")
+        inserted, errors = insert_to_supabase(aggregated)
 
     print()
     print("=" * 60)
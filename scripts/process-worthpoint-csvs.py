@@ -6,7 +6,12 @@ Process WorthPoint CSVs: filter, normalize, merge, and import to Supabase.
 import os
 import re
 import csv
-from collections import defaultdict
+import math
+import functools
+import operator
+from collections import defaultdict, namedtuple
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 DATA_DIR = os.path.expanduser("~/lithos/scripts/worthpoint-data")
@@ -46,23 +51,64 @@ MATERIAL_CONFIG = {
     "impact-spherules": ("kpg-boundary", lambda t: "spherule" in t or "impact" in t or "kt" in t or "cretaceous" in t),
 }
 
+# Source CSV fields as read_csv yields them, each with the column names to
+# try in order (first non-empty wins)
+SOURCE_FIELDS = (
+    ('title',),
+    ('price_usd', 'price'),
+    ('sale_date', 'date'),
+    ('weight_grams',),
+)
+
+# Merged CSV columns; rows are written as tuples in this order
+MergedRow = namedtuple('MergedRow', ['material_slug', 'title', 'price_usd', 'sale_date',
+                                     'weight_grams', 'price_per_gram', 'source'])
+
+# Config keys, longest (most specific) first, for partial filename matches
+SORTED_KEYS = sorted(MATERIAL_CONFIG, key=len, reverse=True)
+
+# Weight units as (named group, grams multiplier), in match priority order
+WEIGHT_UNITS = (
+    ("g", 1.0),
+    ("g_dash", 1.0),
+    ("gr", 1.0),
+    ("ct", 0.2),
+    ("carat", 0.2),
+    ("oz", 28.35),
+    ("kg", 1000.0),
+    ("lb", 453.6),
+)
+# A number followed by a unit; the named group that matched identifies the unit
+WEIGHT_RE = re.compile(
+    r'(\d+\.?\d*)(?:\s*(?:'
+    r'(?P<g>g(?:rams?)?(?:\s|$|,))'
+    r'|(?P<gr>gr\.?(?:\s|$))'
+    r'|(?P<ct>cts?(?:\s|$))'
+    r'|(?P<carat>carat)'
+    r'|(?P<oz>oz(?:\s|$))'
+    r'|(?P<kg>kg(?:\s|$))'
+    r'|(?P<lb>lbs?(?:\s|$))'
+    r')|-(?P<g_dash>g(?:rams?)?))',
+    re.IGNORECASE,
+)
+PRICE_JUNK_RE = re.compile(r'[$,\s]')
+
 
 def extract_weight(title: str) -> float | None:
     """Extract weight in grams from title."""
-    patterns = [
-        (r'(\d+\.?\d*)\s*[Gg](?:rams?)?(?:\s|$|,)', 1.0),
-        (r'(\d+\.?\d*)-[Gg](?:rams?)?', 1.0),
-        (r'(\d+\.?\d*)\s*[Gg]r\.?(?:\s|$)', 1.0),
-        (r'(\d+\.?\d*)\s*ct(?:s)?(?:\s|$)', 0.2),
-        (r'(\d+\.?\d*)\s*carat', 0.2),
-        (r'(\d+\.?\d*)\s*oz(?:\s|$)', 28.35),
-        (r'(\d+\.?\d*)\s*kg(?:\s|$)', 1000.0),
-        (r'(\d+\.?\d*)\s*lb(?:s)?(?:\s|$)', 453.6),
-    ]
-    for pattern, multiplier in patterns:
-        match = re.search(pattern, title, re.IGNORECASE)
-        if match:
-            weight = float(match.group(1)) * multiplier
+    # One scan records the first match per unit, then units are tried in priority order.
+    # Grams outrank every other unit, so a sane first gram match ends the scan early.
+    found = {}
+    for match in WEIGHT_RE.finditer(title):
+        unit = match.lastgroup
+        if unit == "g" and unit not in found:
+            weight = float(match.group(1))
+            if 0.01 < weight < 100000:
+                return round(weight, 3)
+        found.setdefault(unit, match.group(1))
+    for unit, multiplier in WEIGHT_UNITS:
+        if unit in found:
+            weight = float(found[unit]) * multiplier
             if 0.01 < weight < 100000:
                 return round(weight, 3)
     return None
@@ -72,14 +118,18 @@ def parse_price(price_str: str) -> float | None:
     """Parse price string to float."""
     if not price_str:
         return None
-    # Remove $, commas, whitespace
-    cleaned = re.sub(r'[$,\s]', '', str(price_str))
+    # Fast path for the common "$123.45" form; float() already tolerates
+    # surrounding whitespace, so only exotic forms need the regex cleanup
     try:
-        price = float(cleaned)
-        if 0 < price < 1000000:
-            return round(price, 2)
-    except:
-        pass
+        price = float(price_str[1:] if price_str[0] == '$' else price_str)
+    except ValueError:
+        try:
+            # Remove $, commas, whitespace
+            price = float(PRICE_JUNK_RE.sub('', str(price_str)))
+        except ValueError:
+            return None
+    if 0 < price < 1000000:
+        return round(price, 2)
     return None
 
 
@@ -87,225 +137,260 @@ def parse_date(date_str: str) -> str | None:
     """Parse date to YYYY-MM-DD format."""
     if not date_str:
         return None
-    formats = ["%b %d, %Y", "%B %d, %Y", "%m/%d/%Y", "%Y-%m-%d"]
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(str(date_str).strip(), fmt)
-            return dt.strftime("%Y-%m-%d")
-        except:
-            continue
-    return str(date_str) if date_str else None
+    s = str(date_str).strip()
+    # Already YYYY-MM-DD (the common case) - no parsing needed
+    if len(s) == 10 and s[4] == '-' and s[7] == '-' and s[:4].isdigit() and s[5:7].isdigit() and s[8:].isdigit():
+        return s
+    # Pick the format from the string's shape so strptime runs at most once
+    if '/' in s:
+        fmt = "%m/%d/%Y"
+    elif '-' in s:
+        fmt = "%Y-%m-%d"
+    elif s[:1].isalpha():
+        fmt = "%b %d, %Y" if len(s.split(' ', 1)[0]) == 3 else "%B %d, %Y"
+    else:
+        return str(date_str)
+    try:
+        return datetime.strptime(s, fmt).strftime("%Y-%m-%d")
+    except ValueError:
+        return str(date_str)
 
 
+@functools.lru_cache(maxsize=None)
 def get_material_key(filename: str) -> str | None:
     """Get the material config key from filename."""
     base = os.path.basename(filename).replace('.csv', '').lower()
     # Try exact match first
     if base in MATERIAL_CONFIG:
         return base
-    # Try partial match
-    for key in MATERIAL_CONFIG:
+    # Try partial match, most specific key first
+    for key in SORTED_KEYS:
         if key in base or base in key:
             return key
     return None
 
 
-def read_csv(filepath: str) -> list[dict]:
-    """Read CSV file and return list of dicts."""
-    rows = []
+def read_csv(filepath: str) -> Iterator[tuple[str, str, str, str]]:
+    """
+    Read CSV file and yield (title, price, date, weight_grams) per row.
+    Column positions come from the header once; no dict is built per row.
+    """
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            header = next(reader, [])
+
+            # Index of every matching column per field; missing fields point
+            # at a '' pad cell appended past the end of each row
+            pad = len(header)
+            columns = [[header.index(name) for name in names if name in header] or [pad]
+                       for names in SOURCE_FIELDS]
+            get_fields = operator.itemgetter(*(c[0] for c in columns))
+            fallbacks = [(field, c[1:]) for field, c in enumerate(columns) if len(c) > 1]
+
             for row in reader:
-                rows.append(row)
+                if len(row) <= pad:
+                    row.extend([''] * (pad + 1 - len(row)))
+                fields = get_fields(row)
+                if fallbacks:
+                    fields = list(fields)
+                    for field, alternates in fallbacks:
+                        for i in alternates:
+                            if fields[field]:
+                                break
+                            fields[field] = row[i]
+                    fields = tuple(fields)
+                yield fields
     except Exception as e:
         print(f"  Error reading {filepath}: {e}")
-    return rows
 
 
-def main():
-    print("=" * 70)
-    print("WORTHPOINT CSV PROCESSOR")
-    print("=" * 70)
-    print()
+def normalize_row(fields: tuple[str, str, str, str], material_slug: str) -> MergedRow | None:
+    """Normalize a filtered row to the merged CSV layout. Returns None if it has no price."""
+    title, price_str, date_str, weight_str = fields
 
-    # Step 1: Read all CSVs and show raw counts
-    print("STEP 1: RAW ROW COUNTS")
-    print("-" * 50)
+    # Parse price
+    price = parse_price(price_str)
+    if not price:
+        return None
 
-    all_files = sorted([f for f in os.listdir(DATA_DIR) if f.endswith('.csv') and f != 'worthpoint-all-materials.csv'])
-    raw_data = {}
-    total_raw = 0
+    # Parse date
+    date = parse_date(date_str)
 
-    for filename in all_files:
-        filepath = os.path.join(DATA_DIR, filename)
-        rows = read_csv(filepath)
-        raw_data[filename] = rows
-        total_raw += len(rows)
-        print(f"  {filename}: {len(rows)} rows")
+    # Parse weight (from title or existing field)
+    weight = None
+    if weight_str:
+        try:
+            weight = float(weight_str)
+        except:
+            pass
+    if not weight:
+        weight = extract_weight(title)
 
-    print(f"\n  TOTAL RAW: {total_raw} rows")
-    print()
+    # Calculate price per gram
+    price_per_gram = None
+    if weight and weight > 0:
+        price_per_gram = round(price / weight, 2)
 
-    # Step 2: Filter each CSV
-    print("STEP 2: FILTERING BY TITLE")
-    print("-" * 50)
+    return MergedRow(material_slug, title, price, date, weight, price_per_gram, 'WorthPoint')
 
-    filtered_data = defaultdict(list)
-    seen_titles = set()  # Global deduplication
-    filter_stats = {}
 
-    for filename, rows in raw_data.items():
-        material_key = get_material_key(filename)
-        if not material_key:
-            print(f"  WARNING: No config for {filename}, skipping")
-            continue
+def process_file(filename: str) -> tuple[int, list[tuple[str, MergedRow | None]] | None]:
+    """
+    Filter and normalize one source CSV (runs in a worker process).
 
-        material_slug, filter_fn = MATERIAL_CONFIG[material_key]
+    Returns the raw row count and the rows that passed the title filter as
+    (title key, normalized row or None), deduplicated within the file. Keys
+    are returned as strings because hash() is randomized per process. Rows
+    is None when the file has no material config.
+    """
+    filepath = os.path.join(DATA_DIR, filename)
+    material_key = get_material_key(filename)
+    if not material_key:
+        return sum(1 for _ in read_csv(filepath)), None
 
-        before = len(rows)
-        kept = 0
-        dropped = 0
+    material_slug, filter_fn = MATERIAL_CONFIG[material_key]
 
-        for row in rows:
-            title = row.get('title', '').lower()
+    before = 0
+    seen = set()
+    rows = []
+    for row in read_csv(filepath):
+        before += 1
+        title = row[0].lower()
 
-            # Apply filter
-            if not filter_fn(title):
-                dropped += 1
-                continue
+        # Apply filter
+        if not filter_fn(title):
+            continue
 
-            # Deduplicate by title (first 60 chars)
-            title_key = title[:60]
-            if title_key in seen_titles:
-                dropped += 1
-                continue
-            seen_titles.add(title_key)
+        title_key = title[:60]
+        if title_key in seen:
+            continue
+        seen.add(title_key)
+        rows.append((title_key, normalize_row(row, material_slug)))
 
-            # Add to filtered data with normalized material slug
-            row['material_slug'] = material_slug
-            filtered_data[material_slug].append(row)
-            kept += 1
+    return before, rows
 
-        filter_stats[filename] = (before, kept, dropped)
-        print(f"  {filename}: {before} -> {kept} ({dropped} dropped)")
 
-    total_filtered = sum(len(rows) for rows in filtered_data.values())
-    print(f"\n  TOTAL AFTER FILTER: {total_filtered} rows (dropped {total_raw - total_filtered})")
+def main():
+    print("=" * 70)
+    print("WORTHPOINT CSV PROCESSOR")
+    print("=" * 70)
     print()
 
-    # Step 3: Normalize data
-    print("STEP 3: NORMALIZING DATA")
+    # Step 1: Filter + normalize each CSV in a worker process, then dedup and
+    # stream to the merged CSV here. Only the dedup set, per-material
+    # aggregates and ppg values stay in memory.
+    print("STEP 1: FILTERING BY TITLE")
     print("-" * 50)
 
-    all_rows = []
-    weight_stats = defaultdict(lambda: {'total': 0, 'with_weight': 0})
+    all_files = sorted([f for f in os.listdir(DATA_DIR) if f.endswith('.csv') and f != 'worthpoint-all-materials.csv'])
 
-    for material_slug, rows in filtered_data.items():
-        for row in rows:
-            # Parse price
-            price = parse_price(row.get('price_usd') or row.get('price'))
-            if not price:
+    seen_titles: set[int] = set()  # Global deduplication (hashes of title keys)
+    # Running per-material aggregates - no per-row lists needed for the summary
+    material_stats = defaultdict(lambda: {
+        'total': 0, 'with_weight': 0,
+        'min_price': math.inf, 'max_price': -math.inf,
+        'ppg_count': 0, 'ppg_sum': 0.0,
+    })
+    all_ppg = []  # kept only for the overall median
+    total_raw = 0
+    total_filtered = 0
+    total_rows = 0
+
+    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as out, ProcessPoolExecutor() as executor:
+        writer = csv.writer(out)
+        writer.writerow(MergedRow._fields)
+
+        # Files are filtered/normalized in parallel; map() keeps them in sorted
+        # order so the global dedup below still keeps the first-seen row
+        for filename, (before, rows) in zip(all_files, executor.map(process_file, all_files)):
+            total_raw += before
+            if rows is None:
+                print(f"  WARNING: No config for {filename}, skipping {before} rows")
                 continue
 
-            # Parse date
-            date = parse_date(row.get('sale_date') or row.get('date'))
-
-            # Parse weight (from title or existing field)
-            title = row.get('title', '')
-            weight = None
-            if row.get('weight_grams'):
-                try:
-                    weight = float(row['weight_grams'])
-                except:
-                    pass
-            if not weight:
-                weight = extract_weight(title)
-
-            # Calculate price per gram
-            price_per_gram = None
-            if weight and weight > 0:
-                price_per_gram = round(price / weight, 2)
-
-            weight_stats[material_slug]['total'] += 1
-            if weight:
-                weight_stats[material_slug]['with_weight'] += 1
-
-            all_rows.append({
-                'material_slug': material_slug,
-                'title': title,
-                'price_usd': price,
-                'sale_date': date,
-                'weight_grams': weight,
-                'price_per_gram': price_per_gram,
-                'source': 'WorthPoint',
-            })
-
-    print(f"  Normalized {len(all_rows)} rows")
-    for mat, stats in sorted(weight_stats.items()):
-        pct = (stats['with_weight'] / stats['total'] * 100) if stats['total'] > 0 else 0
-        print(f"    {mat}: {stats['total']} rows, {stats['with_weight']} with weight ({pct:.0f}%)")
+            kept = 0
+            for title_key, normalized in rows:
+                # Deduplicate by title (first 60 chars); storing the 64-bit
+                # hash instead of the string keeps the set small
+                title_key = hash(title_key)
+                if title_key in seen_titles:
+                    continue
+                seen_titles.add(title_key)
+                kept += 1
+
+                if not normalized:
+                    continue
+                writer.writerow(normalized)
+                total_rows += 1
+
+                stats = material_stats[normalized.material_slug]
+                stats['total'] += 1
+                if normalized.weight_grams:
+                    stats['with_weight'] += 1
+                if normalized.price_usd < stats['min_price']:
+                    stats['min_price'] = normalized.price_usd
+                if normalized.price_usd > stats['max_price']:
+                    stats['max_price'] = normalized.price_usd
+                if normalized.price_per_gram:
+                    stats['ppg_count'] += 1
+                    stats['ppg_sum'] += normalized.price_per_gram
+                    all_ppg.append(normalized.price_per_gram)
+
+            total_filtered += kept
+            print(f"  {filename}: {before} -> {kept} ({before - kept} dropped)")
+
+    print(f"\n  TOTAL RAW: {total_raw} rows")
+    print(f"  TOTAL AFTER FILTER: {total_filtered} rows (dropped {total_raw - total_filtered})")
     print()
 
-    # Step 4: Save merged CSV
-    print("STEP 4: SAVING MERGED CSV")
+    # Step 2: Normalization results
+    print("STEP 2: NORMALIZING DATA")
     print("-" * 50)
 
-    fieldnames = ['material_slug', 'title', 'price_usd', 'sale_date', 'weight_grams', 'price_per_gram', 'source']
+    print(f"  Normalized {total_rows} rows")
+    for mat, stats in sorted(material_stats.items()):
+        pct = (stats['with_weight'] / stats['total'] * 100) if stats['total'] > 0 else 0
+        print(f"    {mat}: {stats['total']} rows, {stats['with_weight']} with weight ({pct:.0f}%)")
+    print()
 
-    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(all_rows)
+    # Step 3: Merged CSV
+    print("STEP 3: SAVING MERGED CSV")
+    print("-" * 50)
 
-    print(f"  Saved {len(all_rows)} rows to {OUTPUT_FILE}")
+    print(f"  Saved {total_rows} rows to {OUTPUT_FILE}")
     print()
 
-    # Step 5: Summary stats
-    print("STEP 5: SUMMARY STATISTICS")
+    # Step 4: Summary stats
+    print("STEP 4: SUMMARY STATISTICS")
     print("-" * 50)
 
-    print(f"\n  TOTAL ROWS: {len(all_rows)}")
+    print(f"\n  TOTAL ROWS: {total_rows}")
     print()
     print("  ROWS PER MATERIAL:")
 
-    material_counts = defaultdict(int)
-    material_prices = defaultdict(list)
-    material_ppg = defaultdict(list)
-
-    for row in all_rows:
-        mat = row['material_slug']
-        material_counts[mat] += 1
-        if row['price_usd']:
-            material_prices[mat].append(row['price_usd'])
-        if row['price_per_gram']:
-            material_ppg[mat].append(row['price_per_gram'])
-
     print(f"  {'Material':<30} {'Count':>8} {'Price Range':>20} {'Avg $/g':>12}")
     print(f"  {'-'*30} {'-'*8} {'-'*20} {'-'*12}")
 
-    for mat in sorted(material_counts.keys()):
-        count = material_counts[mat]
-        prices = material_prices[mat]
-        ppg = material_ppg[mat]
-
-        price_range = f"${min(prices):.0f} - ${max(prices):.0f}" if prices else "N/A"
-        avg_ppg = f"${sum(ppg)/len(ppg):.2f}" if ppg else "N/A"
+    for mat, stats in sorted(material_stats.items()):
+        count = stats['total']
+        price_range = f"${stats['min_price']:.0f} - ${stats['max_price']:.0f}" if count else "N/A"
+        avg_ppg = f"${stats['ppg_sum']/stats['ppg_count']:.2f}" if stats['ppg_count'] else "N/A"
 
         print(f"  {mat:<30} {count:>8} {price_range:>20} {avg_ppg:>12}")
 
     print()
-    print(f"  GRAND TOTAL: {len(all_rows)} rows across {len(material_counts)} materials")
+    print(f"  GRAND TOTAL: {total_rows} rows across {len(material_stats)} materials")
 
     # Overall stats
-    all_prices = [r['price_usd'] for r in all_rows if r['price_usd']]
-    all_ppg = [r['price_per_gram'] for r in all_rows if r['price_per_gram']]
+    min_price = min(stats['min_price'] for stats in material_stats.values())
+    max_price = max(stats['max_price'] for stats in material_stats.values())
 
-    print(f"\n  OVERALL PRICE RANGE: ${min(all_prices):.2f} - ${max(all_prices):.2f}")
-    print(f"  ROWS WITH WEIGHT DATA: {len(all_ppg)} ({len(all_ppg)/len(all_rows)*100:.1f}%)")
+    print(f"\n  OVERALL PRICE RANGE: ${min_price:.2f} - ${max_price:.2f}")
+    print(f"  ROWS WITH WEIGHT DATA: {len(all_ppg)} ({len(all_ppg)/total_rows*100:.1f}%)")
     if all_ppg:
-        all_ppg_sorted = sorted(all_ppg)
-        median_ppg = all_ppg_sorted[len(all_ppg_sorted)//2]
+        all_ppg.sort()  # in place - the list is ours, no need for a sorted copy
+        median_ppg = all_ppg[len(all_ppg)//2]
         print(f"  MEDIAN PRICE/GRAM: ${median_ppg:.2f}")
         print(f"  AVERAGE PRICE/GRAM: ${sum(all_ppg)/len(all_ppg):.2f}")
 
@@ -314,8 +399,6 @@ def main():
     print("DONE! Ready for Supabase import.")
     print("=" * 70)
 
-    return all_rows
-
 
 if __name__ == "__main__":
     main()
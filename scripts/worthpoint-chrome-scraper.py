@@ -6,40 +6,70 @@ Uses your logged-in Chrome session to avoid bot detection.
 IMPORTANT: Close Chrome before running this script!
 
 Usage:
-    python3 worthpoint-chrome-scraper.py --material "Darwin Glass"
-    python3 worthpoint-chrome-scraper.py --material "trinitite"
+    python3 worthpoint-chrome-scraper.py --materials "Darwin Glass"
+    python3 worthpoint-chrome-scraper.py --materials "Darwin Glass" "trinitite"
+
+Multiple materials share one Chrome session, so the profile is only loaded once.
+Search pages are fetched in parallel tabs (--concurrency, default 2).
 """
 
 import re
 import csv
-import time
+import random
+import asyncio
 import argparse
 import os
+import operator
 from datetime import datetime
 from urllib.parse import quote
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
 
 # Configuration
 OUTPUT_DIR = os.path.expanduser("~/lithos/scripts/worthpoint-data")
 CHROME_PROFILE = os.path.expanduser("~/Library/Application Support/Google/Chrome/Default")
 DELAY_BETWEEN_PAGES = 3
 MAX_PAGES = 200
+CONCURRENT_PAGES = 2  # tabs fetching search pages at once
+
+# Weight units as (named group, grams multiplier), in match priority order;
+# "gr" is a g match spelled "gr..."
+WEIGHT_UNITS = (
+    ("g", 1.0),
+    ("g_dash", 1.0),
+    ("gr", 1.0),
+    ("ct", 0.2),
+    ("oz", 28.35),
+    ("kg", 1000.0),
+)
+# A number followed by a unit; the named group that matched identifies the unit
+WEIGHT_RE = re.compile(
+    r'(\d+\.?\d*)(?:\s*(?:'
+    r'(?P<g>g(?:rams?)?)'
+    r'|(?P<ct>ct)'
+    r'|(?P<oz>oz)'
+    r'|(?P<kg>kg)'
+    r')|-(?P<g_dash>g(?:rams?)?))',
+    re.IGNORECASE,
+)
 
 
 def extract_weight(title: str) -> float | None:
-    """Extract weight in grams from title."""
-    patterns = [
-        (r'(\d+\.?\d*)\s*[Gg](?:rams?)?', 1.0),
-        (r'(\d+\.?\d*)-[Gg](?:rams?)?', 1.0),
-        (r'(\d+\.?\d*)\s*[Gg]r\.?', 1.0),
-        (r'(\d+\.?\d*)\s*ct', 0.2),
-        (r'(\d+\.?\d*)\s*oz', 28.35),
-        (r'(\d+\.?\d*)\s*kg', 1000.0),
-    ]
-    for pattern, multiplier in patterns:
-        match = re.search(pattern, title, re.IGNORECASE)
-        if match:
-            weight = float(match.group(1)) * multiplier
+    """
+    Extract weight in grams from title.
+
+    >>> extract_weight("Darwin glass 0g chip, 3 gr")
+    3.0
+    """
+    # One scan records the first match per unit, then units are tried in priority order
+    found = {}
+    for match in WEIGHT_RE.finditer(title):
+        unit = match.lastgroup
+        found.setdefault(unit, match.group(1))
+        if unit == "g" and title.startswith(("r", "R"), match.start("g") + 1):
+            found.setdefault("gr", match.group(1))
+    for unit, multiplier in WEIGHT_UNITS:
+        if unit in found:
+            weight = float(found[unit]) * multiplier
             if 0.01 < weight < 100000:
                 return round(weight, 3)
     return None
@@ -74,11 +104,15 @@ def build_url(query: str, offset: int = 0) -> str:
     )
 
 
-def extract_listings(page, material_filter: str) -> list[dict]:
-    """Extract listings from current page using confirmed selectors."""
+async def extract_listings(page, material_filter: str) -> list[list[str]]:
+    """
+    Extract listings from current page using confirmed selectors.
+    Returns [title, price, date] rows; the material filter runs in the browser
+    so non-matching cards never cross the CDP pipe.
+    """
 
     js_code = """
-    () => {
+    (filter) => {
         const results = [];
         const cards = document.querySelectorAll('li.search-result');
 
@@ -86,6 +120,7 @@ def extract_listings(page, material_filter: str) -> list[dict]:
             // Title from .product-title
             const titleEl = card.querySelector('.product-title');
             const title = titleEl ? titleEl.textContent.trim() : '';
+            if (!title || !title.toLowerCase().includes(filter)) return;
 
             // Price from .price .result - use title attribute
             const priceEl = card.querySelector('.price .result');
@@ -95,8 +130,8 @@ def extract_listings(page, material_filter: str) -> list[dict]:
             const dateEl = card.querySelector('.sold-date .result');
             const date = dateEl ? dateEl.textContent.trim() : '';
 
-            if (title && price) {
-                results.push({ title, price, date });
+            if (price) {
+                results.push([title, price, date]);
             }
         });
 
@@ -105,21 +140,19 @@ def extract_listings(page, material_filter: str) -> list[dict]:
     """
 
     try:
-        listings = page.evaluate(js_code)
         # Filter by material name
-        filter_lower = material_filter.lower()
-        return [l for l in listings if filter_lower in l['title'].lower()]
+        return await page.evaluate(js_code, material_filter.lower())
     except Exception as e:
         print(f"    Error extracting: {e}")
         return []
 
 
-def has_next_page(page) -> bool:
+async def has_next_page(page) -> bool:
     """Check if there's a next page."""
     try:
-        next_btn = page.query_selector('a.nextLink')
+        next_btn = await page.query_selector('a.nextLink')
         if next_btn:
-            classes = next_btn.get_attribute('class') or ''
+            classes = await next_btn.get_attribute('class') or ''
             return 'disabled' not in classes
     except:
         pass
@@ -138,139 +171,135 @@ def save_csv(slug: str, data: list[dict]):
     fieldnames = ["material_slug", "title", "price_usd", "sale_date",
                   "weight_grams", "price_per_gram", "source"]
 
+    # Plain tuples via itemgetter instead of DictWriter's per-field lookups
+    get_row = operator.itemgetter(*fieldnames)
     with open(filepath, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(map(get_row, data))
 
     print(f"  Saved {len(data)} listings to {filepath}")
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Scrape WorthPoint with Chrome profile")
-    parser.add_argument("--material", required=True, help="Material name to search")
-    parser.add_argument("--delay", type=int, default=3, help="Delay between pages (seconds)")
-    parser.add_argument("--headless", action="store_true", help="Run headless (not recommended)")
-    args = parser.parse_args()
+async def fetch_page(page, material: str, offset: int, prompt_lock: asyncio.Lock) -> tuple[list[list[str]] | None, bool]:
+    """
+    Load one search results page in the given tab.
+    Returns (listings, has_next); listings are [title, price, date] rows, or
+    None if the page had no results.
+    """
+    url = build_url(material, offset)
+    await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+    await asyncio.sleep(2)  # Wait for JS rendering
+
+    # Check for CAPTCHA/block - prompts are serialized across tabs
+    content = (await page.content()).lower()
+    if "please verify you are a human" in content:
+        async with prompt_lock:
+            print("\nCAPTCHA detected! Please solve it in the browser window...")
+            await asyncio.to_thread(input, "Press Enter after solving the CAPTCHA...")
+        await page.reload()
+        await asyncio.sleep(2)
+
+    # Check if logged in
+    if "sign in" in content and "sign out" not in content:
+        async with prompt_lock:
+            print("\nNot logged in! Please log into WorthPoint in this browser.")
+            await asyncio.to_thread(input, "Press Enter after logging in...")
+        await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        await asyncio.sleep(2)
+
+    # Wait for results to load
+    try:
+        await page.wait_for_selector("li.search-result", timeout=10000)
+    except:
+        return None, False
 
-    global DELAY_BETWEEN_PAGES
-    DELAY_BETWEEN_PAGES = args.delay
+    listings = await extract_listings(page, material)
+    return listings, await has_next_page(page)
 
-    material = args.material
-    slug = material.lower().replace(" ", "-")
-
-    print(f"=" * 50)
-    print(f"WorthPoint Scraper - {material}")
-    print(f"=" * 50)
-    print()
-    print("IMPORTANT: Make sure Chrome is completely closed!")
-    print()
 
+async def scrape_material(pages: list, material: str, prompt_lock: asyncio.Lock) -> list[dict]:
+    """
+    Scrape all listings for one material.
+    Consecutive offsets are fetched in parallel, one per tab, then handled in
+    offset order so the empty-page and last-page checks behave as before.
+    """
+    slug = material.lower().replace(" ", "-")
     results = []
-    seen_titles = set()
+    seen_titles: set[int] = set()  # hashes of title keys
 
-    with sync_playwright() as p:
-        # Launch Chrome with user profile
-        print("Launching Chrome with your profile...")
+    offset = 0
+    page_num = 0
+    consecutive_empty = 0
+    done = False
 
-        # Use persistent context to access Chrome profile
-        context = p.chromium.launch_persistent_context(
-            user_data_dir=CHROME_PROFILE,
-            channel="chrome",  # Use installed Chrome
-            headless=args.headless,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-            ],
-            viewport={"width": 1920, "height": 1080},
-        )
+    while page_num < MAX_PAGES and not done:
+        offsets = [offset + 20 * i for i in range(min(len(pages), MAX_PAGES - page_num))]
 
-        page = context.pages[0] if context.pages else context.new_page()
+        async def fetch(i: int, tab_offset: int):
+            # Stagger the tabs with jitter so requests don't land in lockstep
+            await asyncio.sleep(i * random.uniform(0.5, 1.5))
+            return await fetch_page(pages[i], material, tab_offset, prompt_lock)
 
-        # Navigate to first search page
-        offset = 0
-        page_num = 0
-        consecutive_empty = 0
+        fetched = await asyncio.gather(
+            *(fetch(i, o) for i, o in enumerate(offsets)), return_exceptions=True
+        )
 
-        while page_num < MAX_PAGES:
+        for page_offset, outcome in zip(offsets, fetched):
             page_num += 1
-            url = build_url(material, offset)
-
-            print(f"Page {page_num} (offset {offset})...", end=" ", flush=True)
+            print(f"Page {page_num} (offset {page_offset})...", end=" ", flush=True)
 
-            try:
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                time.sleep(2)  # Wait for JS rendering
-            except Exception as e:
-                print(f"navigation error: {e}")
+            if isinstance(outcome, BaseException):
+                print(f"navigation error: {outcome}")
+                done = True
                 break
 
-            # Check for CAPTCHA/block
-            content = page.content().lower()
-            if "please verify you are a human" in content:
-                print("\nCAPTCHA detected! Please solve it in the browser window...")
-                input("Press Enter after solving the CAPTCHA...")
-                page.reload()
-                time.sleep(2)
-
-            # Check if logged in
-            if "sign in" in content and "sign out" not in content:
-                print("\nNot logged in! Please log into WorthPoint in this browser.")
-                input("Press Enter after logging in...")
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                time.sleep(2)
-
-            # Wait for results to load
-            try:
-                page.wait_for_selector("li.search-result", timeout=10000)
-            except:
+            listings, has_next = outcome
+
+            if listings is None:
                 print("no results found")
                 consecutive_empty += 1
                 if consecutive_empty >= 2:
+                    done = True
                     break
-                offset += 20
-                time.sleep(DELAY_BETWEEN_PAGES)
                 continue
 
-            # Extract listings
-            listings = extract_listings(page, material)
-
             if not listings:
                 print(f"0 matching '{material}'")
                 consecutive_empty += 1
                 if consecutive_empty >= 2:
                     print("  No more matching results")
+                    done = True
                     break
-                offset += 20
-                time.sleep(DELAY_BETWEEN_PAGES)
                 continue
 
             consecutive_empty = 0
             new_count = 0
 
-            for listing in listings:
-                # Deduplicate
-                title_key = listing["title"].lower()[:60]
+            for title, price_text, date_text in listings:
+                # Deduplicate on the hash of the title key, not the string
+                title_key = hash(title.lower()[:60])
                 if title_key in seen_titles:
                     continue
                 seen_titles.add(title_key)
 
                 # Parse price
-                price_str = listing["price"].replace("$", "").replace(",", "")
+                price_str = price_text.replace("$", "").replace(",", "")
                 try:
                     price = float(price_str)
                 except:
                     continue
 
                 # Parse date
-                date = parse_date(listing["date"])
+                date = parse_date(date_text)
 
                 # Extract weight
-                weight = extract_weight(listing["title"])
+                weight = extract_weight(title)
                 price_per_gram = round(price / weight, 2) if weight and weight > 0 else None
 
                 results.append({
                     "material_slug": slug,
-                    "title": listing["title"],
+                    "title": title,
                     "price_usd": price,
                     "sale_date": date,
                     "weight_grams": weight,
@@ -282,28 +311,93 @@ def main():
             print(f"{new_count} new (total: {len(results)})")
 
             # Check for next page
-            if not has_next_page(page):
+            if not has_next:
                 print("  Last page reached")
+                done = True
                 break
 
-            offset += 20
-            time.sleep(DELAY_BETWEEN_PAGES)
+        offset = offsets[-1] + 20
+        if not done:
+            await asyncio.sleep(DELAY_BETWEEN_PAGES + random.uniform(0, 1))
+
+    return results
+
+
+def print_stats(results: list[dict]):
+    """Print summary statistics."""
+    prices_per_gram = [r["price_per_gram"] for r in results if r["price_per_gram"]]
+    if prices_per_gram:
+        prices_per_gram.sort()
+        median = prices_per_gram[len(prices_per_gram) // 2]
+        avg = sum(prices_per_gram) / len(prices_per_gram)
+        print(f"  Stats: {len(prices_per_gram)} with weight data")
+        print(f"  Median: ${median:.2f}/gram, Average: ${avg:.2f}/gram")
+
+
+async def run(args):
+    """Open one Chrome session and scrape each requested material."""
+    prompt_lock = asyncio.Lock()
+
+    async with async_playwright() as p:
+        # Launch Chrome with user profile
+        print("Launching Chrome with your profile...")
+
+        # Use persistent context to access Chrome profile
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=CHROME_PROFILE,
+            channel="chrome",  # Use installed Chrome
+            headless=args.headless,
+            args=[
+                "--disable-blink-features=AutomationControlled",
+            ],
+            viewport={"width": 1920, "height": 1080},
+        )
+
+        pages = list(context.pages[:CONCURRENT_PAGES])
+        while len(pages) < CONCURRENT_PAGES:
+            pages.append(await context.new_page())
+
+        # One browser session for every material - profile load, cookies and
+        # HTTP cache are shared instead of paid again per material
+        for i, material in enumerate(args.materials):
+            if i > 0:
+                await asyncio.gather(*(page.goto("about:blank") for page in pages))
+                await asyncio.sleep(DELAY_BETWEEN_PAGES * 2)
+
+            print()
+            print(f"=" * 50)
+            print(f"WorthPoint Scraper - {material}")
+            print(f"=" * 50)
+            print()
+
+            results = await scrape_material(pages, material, prompt_lock)
+
+            # Save results
+            print()
+            save_csv(material.lower().replace(" ", "-"), results)
+            print_stats(results)
+
+        await context.close()
+
 
-        context.close()
+def main():
+    parser = argparse.ArgumentParser(description="Scrape WorthPoint with Chrome profile")
+    parser.add_argument("--materials", "--material", nargs="+", required=True,
+                        help="Material name(s) to search")
+    parser.add_argument("--delay", type=int, default=3, help="Delay between pages (seconds)")
+    parser.add_argument("--concurrency", type=int, default=2,
+                        help="Search pages fetched in parallel (default: 2)")
+    parser.add_argument("--headless", action="store_true", help="Run headless (not recommended)")
+    args = parser.parse_args()
 
-    # Save results
+    global DELAY_BETWEEN_PAGES, CONCURRENT_PAGES
+    DELAY_BETWEEN_PAGES = args.delay
+    CONCURRENT_PAGES = max(1, args.concurrency)
+
+    print("IMPORTANT: Make sure Chrome is completely closed!")
     print()
-    save_csv(slug, results)
-
-    # Print stats
-    if results:
-        prices_per_gram = [r["price_per_gram"] for r in results if r["price_per_gram"]]
-        if prices_per_gram:
-            prices_per_gram.sort()
-            median = prices_per_gram[len(prices_per_gram) // 2]
-            avg = sum(prices_per_gram) / len(prices_per_gram)
-            print(f"  Stats: {len(prices_per_gram)} with weight data")
-            print(f"  Median: ${median:.2f}/gram, Average: ${avg:.2f}/gram")
+
+    asyncio.run(run(args))
 
     print()
     print(f"{'=' * 50}")
@@ -11,8 +11,8 @@ Usage:
     # Scrape single material (browser opens - solve CAPTCHA if prompted)
     python worthpoint-playwright.py --cookie "YOUR_GC_SESSION_COOKIE" --material darwin-glass
 
-    # Scrape all materials
-    python worthpoint-playwright.py --cookie "YOUR_GC_SESSION_COOKIE" --all
+    # Scrape all materials, 3 at a time (each in its own browser context)
+    python worthpoint-playwright.py --cookie "YOUR_GC_SESSION_COOKIE" --all --concurrency 3
 
     # Run headless (may be blocked by bot detection)
     python worthpoint-playwright.py --cookie "YOUR_COOKIE" --material darwin-glass --headless
@@ -23,20 +23,59 @@ typically continues without further challenges.
 """
 
 import re
+import math
+import statistics
 import csv
 import time
+import asyncio
 import argparse
 import os
+import functools
+import contextlib
+import types
+import inspect
 from datetime import datetime
-from urllib.parse import quote_plus
-from playwright.sync_api import sync_playwright, Page
+from urllib.parse import quote_plus, urlsplit
+from playwright.async_api import async_playwright, Page
 from playwright_stealth import Stealth
 
+
+def disable_playwright_stack_capture():
+    """
+    Stop Playwright from calling inspect.stack() on every API call.
+
+    The captured caller stack only feeds error messages and tracing, yet it
+    is a large share of per-call time. Opt in with PW_FAST_STACKS=1. This
+    patches a private Playwright module, so Playwright error messages and
+    traces lose their apiName and call-site stack while it is on; if the
+    internals have moved, it does nothing.
+    """
+    if os.environ.get("PW_FAST_STACKS", "0") == "0":
+        return
+    try:
+        from playwright._impl import _connection
+        _connection.inspect.stack  # AttributeError if the internals have moved
+        fast_inspect = types.ModuleType("inspect")
+        fast_inspect.__dict__.update(inspect.__dict__)
+        fast_inspect.stack = lambda *args, **kwargs: []
+        _connection.inspect = fast_inspect
+    except (ImportError, AttributeError):
+        return
+
+
+disable_playwright_stack_capture()
+
 # Configuration
 OUTPUT_DIR = "./worthpoint-data"
 DELAY_BETWEEN_PAGES = 3  # seconds
+MAX_CONCURRENCY = 3  # materials scraped in parallel
+PARANOID = False  # add the old fixed render waits and scroll nudge
 MAX_PAGES = 100  # safety limit
 
+# Only text and img alt attributes are read, so skip downloading these.
+# Site stylesheets still load in case the lazy-loaded prices depend on layout.
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
 # Materials to scrape with search terms and category filter
 MATERIALS = {
     "darwin-glass": {
@@ -85,27 +124,58 @@ MATERIALS = {
     },
 }
 
+# (unit, multiplier to grams) in priority order; "gr" is a g match spelled "gr..."
+WEIGHT_UNITS = (
+    ("g", 1.0),
+    ("g_dash", 1.0),
+    ("gr", 1.0),
+    ("ct", 0.2),
+    ("oz", 28.35),
+    ("kg", 1000.0),
+)
+# A number followed by a unit; the named group that matched identifies the unit
+WEIGHT_RE = re.compile(
+    r'(\d+\.?\d*)(?:\s*(?:'
+    r'(?P<g>g(?:rams?)?)'
+    r'|(?P<ct>ct)'
+    r'|(?P<oz>oz)'
+    r'|(?P<kg>kg)'
+    r')|-(?P<g_dash>g(?:rams?)?))',
+    re.IGNORECASE,
+)
+TOTAL_RE = re.compile(r'([\d,]+)\s+sold items matching')
+SEARCH_URL = (
+    "https://www.worthpoint.com/inventory/search"
+    "?offset={offset}"
+    "&max=20"
+    "&sort=SaleDate"
+    "&query={query}"
+    "&restrictTo=worldwide"
+    "&img=true"
+    "&noGreyList=true"
+    "&saleDate=ALL_TIME"
+)
+
 
 def extract_weight(title: str) -> float | None:
     """Extract weight in grams from title."""
-    patterns = [
-        (r'(\d+\.?\d*)\s*[Gg](?:rams?)?', 1.0),      # grams
-        (r'(\d+\.?\d*)-[Gg](?:rams?)?', 1.0),        # 288-grams
-        (r'(\d+\.?\d*)\s*[Gg]r\.?', 1.0),            # gr.
-        (r'(\d+\.?\d*)\s*ct', 0.2),                   # carats
-        (r'(\d+\.?\d*)\s*oz', 28.35),                 # ounces
-        (r'(\d+\.?\d*)\s*kg', 1000.0),                # kilograms
-    ]
-
-    for pattern, multiplier in patterns:
-        match = re.search(pattern, title, re.IGNORECASE)
-        if match:
-            weight = float(match.group(1)) * multiplier
+    # One scan records the first match per unit, then units are tried in priority order
+    found = {}
+    for match in WEIGHT_RE.finditer(title):
+        unit = match.lastgroup
+        found.setdefault(unit, match.group(1))
+        if unit == "g" and title.startswith(("r", "R"), match.start("g") + 1):
+            found.setdefault("gr", match.group(1))
+    for unit, multiplier in WEIGHT_UNITS:
+        if unit in found:
+            weight = float(found[unit]) * multiplier
             if 0.01 < weight < 100000:  # sanity check
                 return round(weight, 3)
     return None
 
 
+# Sale dates repeat heavily across listings, so parse each distinct string once
+@functools.lru_cache(maxsize=2048)
 def parse_date(date_str: str) -> str | None:
     """Parse date string to YYYY-MM-DD format."""
     if not date_str:
@@ -128,136 +198,147 @@ def parse_date(date_str: str) -> str | None:
 
 def build_url(query: str, offset: int = 0, category: str = None) -> str:
     """Build WorthPoint search URL."""
-    encoded_query = quote_plus(query)
-    url = (
-        f"https://www.worthpoint.com/inventory/search"
-        f"?offset={offset}"
-        f"&max=20"
-        f"&sort=SaleDate"
-        f"&query={encoded_query}"
-        f"&restrictTo=worldwide"
-        f"&img=true"
-        f"&noGreyList=true"
-        f"&saleDate=ALL_TIME"
-    )
+    url = SEARCH_URL.format(offset=offset, query=quote_plus(query))
     if category:
-        url += f"&categories={category}"
+        url += "&categories=" + category
     return url
 
 
-def extract_listings_from_page(page: Page, debug: bool = False) -> list[dict]:
-    """Extract all listings from the current page using JavaScript."""
-
-    # Use specific class selectors for more reliable extraction
-    js_code = """
-    () => {
-        var results = [];
-        var items = document.querySelectorAll(".search-result");
-
-        for (var i = 0; i < items.length; i++) {
-            var item = items[i];
-
-            // Get title from item-link or first text
-            var titleEl = item.querySelector(".item-link");
-            var title = "";
-            if (titleEl) {
-                var img = titleEl.querySelector("img");
-                if (img && img.alt) {
-                    title = img.alt;
-                } else {
-                    title = titleEl.innerText.trim();
-                }
-            }
-            if (!title) {
-                // Fallback to first line of innerText
-                var lines = item.innerText.split(String.fromCharCode(10));
-                for (var k = 0; k < lines.length; k++) {
-                    if (lines[k].trim().length > 5) {
-                        title = lines[k].trim();
-                        break;
-                    }
-                }
-            }
+# Listing extractor, installed into every page as window.__extractListings by
+# an init script so each call sends a short invocation, not this source.
+# Uses specific class selectors for more reliable extraction.
+EXTRACT_LISTINGS_JS = """
+(token) => {
+    // 53-bit cyrb53 hash of a title key, compact enough to keep every seen title
+    function hashKey(str) {
+        var h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+        for (var c = 0; c < str.length; c++) {
+            var ch = str.charCodeAt(c);
+            h1 = Math.imul(h1 ^ ch, 2654435761);
+            h2 = Math.imul(h2 ^ ch, 1597334677);
+        }
+        h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+        h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+        return 4294967296 * (2097151 & h2) + (h1 >>> 0);
+    }
 
-            // Get price from .price .result or look for $
-            var price = null;
-            var priceEl = item.querySelector(".price .result");
-            if (priceEl) {
-                price = priceEl.innerText.trim();
+    // Seen title hashes live in this tab's sessionStorage, which survives the
+    // navigation to each results page, so they never cross the CDP bridge.
+    // A new token (one per material scrape) starts an empty set.
+    var stored = JSON.parse(sessionStorage.getItem("__lithosSeen") || "null");
+    var seen = new Set(stored && stored.token === token ? stored.keys : []);
+
+    var results = [];
+    var count = 0;
+    var missed = 0;
+    var items = document.querySelectorAll(".search-result");
+
+    for (var i = 0; i < items.length; i++) {
+        var item = items[i];
+
+        // Get title from item-link or first text
+        var titleEl = item.querySelector(".item-link");
+        var title = "";
+        if (titleEl) {
+            var img = titleEl.querySelector("img");
+            if (img && img.alt) {
+                title = img.alt;
             } else {
-                // Fallback: search for $ in text
-                var text = item.innerText;
-                var lines = text.split(String.fromCharCode(10));
-                for (var j = 0; j < lines.length; j++) {
-                    if (lines[j].trim().charAt(0) === "$") {
-                        price = lines[j].trim();
-                        break;
-                    }
-                }
+                title = titleEl.innerText.trim();
             }
+        }
+        if (!title) {
+            // Fallback to the product title element
+            var productEl = item.querySelector(".product-title");
+            if (productEl) title = productEl.innerText.trim();
+        }
 
-            // Get date from .sold-date .result
-            var date = null;
-            var dateEl = item.querySelector(".sold-date .result");
-            if (dateEl) {
-                date = dateEl.innerText.trim();
+        // Get price from .price .result, then the bare .price / [data-price]
+        var price = null;
+        var priceEl = item.querySelector(".price .result");
+        if (priceEl) {
+            price = priceEl.innerText.trim();
+        } else {
+            // The bare .price block includes its label ("Sold for $12.50"); keep only the amount
+            var blockEl = item.querySelector(".price");
+            var amount = blockEl ? blockEl.innerText.match(/\\$\\s*[\\d,]+(?:\\.\\d+)?/) : null;
+            if (amount) {
+                price = amount[0];
             } else {
-                // Fallback: search for date pattern
-                var months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"];
-                var text = item.innerText;
-                var lines = text.split(String.fromCharCode(10));
-                for (var m = 0; m < lines.length; m++) {
-                    var line = lines[m].trim();
-                    if (line.length >= 10 && line.length <= 15) {
-                        for (var n = 0; n < months.length; n++) {
-                            if (line.indexOf(months[n]) === 0) {
-                                date = line;
-                                break;
-                            }
-                        }
-                    }
-                    if (date) break;
-                }
+                var dataPriceEl = item.querySelector("[data-price]");
+                if (dataPriceEl) price = dataPriceEl.getAttribute("data-price").trim();
             }
+        }
 
-            if (title && price) {
-                results.push({
-                    title: title,
-                    price: price,
-                    date: date
-                });
-            }
+        // Get date from .sold-date .result, then a <time datetime=...>
+        var date = null;
+        var dateEl = item.querySelector(".sold-date .result");
+        if (dateEl) {
+            date = dateEl.innerText.trim();
+        } else {
+            var timeEl = item.querySelector("time[datetime]");
+            if (timeEl) date = timeEl.getAttribute("datetime");
+        }
+
+        // Cards none of the known selectors match are skipped, not scanned
+        if (!title || !price) missed++;
+
+        if (title && price) {
+            count++;
+            // Deduplicate by title (first 60 chars)
+            var key = hashKey(title.toLowerCase().slice(0, 60));
+            if (seen.has(key)) continue;
+            seen.add(key);
+            results.push({
+                title: title,
+                price: price,
+                date: date
+            });
         }
-        return results;
     }
-    """
+    sessionStorage.setItem("__lithosSeen", JSON.stringify({token: token, keys: Array.from(seen)}));
+    return {listings: results, count: count, missed: missed, cardCount: items.length};
+}
+"""
+
 
+async def extract_listings_from_page(page: Page, seen_token: str, debug: bool = False) -> tuple[list[dict], int, int]:
+    """
+    Extract listings from the current page using JavaScript.
+    Dedup runs in the page against the tab's seen-title set for seen_token
+    (hashes of the lowercased first 60 title chars); a new token starts fresh.
+    Returns (new listings, number of listings on the page before dedup,
+    number of .search-result cards on the page).
+    """
     try:
-        listings = page.evaluate(js_code)
+        extracted = await page.evaluate("(token) => window.__extractListings(token)", seen_token)
+        listings = extracted["listings"]
         if debug:
             if listings:
-                print(f"\n    DEBUG: Extracted {len(listings)} listings. First: {listings[0]}\n")
+                print(f"\n    DEBUG: Extracted {len(listings)} listings ({extracted['missed']} cards skipped). First: {listings[0]}\n")
             else:
                 # Debug why no listings - check if price elements exist
-                count = page.evaluate("document.querySelectorAll('.search-result').length")
-                priceCount = page.evaluate("document.querySelectorAll('.search-result .price').length")
-                sample = page.evaluate("document.querySelectorAll('.search-result')[0]?.innerText?.substring(0, 300) || 'N/A'")
-                print(f"\n    DEBUG: No listings. Elements: {count}, Price elements: {priceCount}")
-                print(f"    Sample text: {sample}\n")
-        return listings if listings else []
+                probe = await page.evaluate("""() => ({
+                    count: document.querySelectorAll('.search-result').length,
+                    priceCount: document.querySelectorAll('.search-result .price').length,
+                    sample: document.querySelectorAll('.search-result')[0]?.innerText?.substring(0, 300) || 'N/A',
+                })""")
+                print(f"\n    DEBUG: No listings. Elements: {probe['count']}, Price elements: {probe['priceCount']}")
+                print(f"    Sample text: {probe['sample']}\n")
+        return listings, extracted["count"], extracted["cardCount"]
     except Exception as e:
         print(f"    Error extracting listings: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        return [], 0, 0
 
 
-def get_total_results(page: Page) -> int:
-    """Get total number of results from page."""
+async def get_total_results(page: Page, html: str) -> int:
+    """Get total number of results from the already-fetched page HTML."""
     try:
-        # Look for "X,XXX sold items matching" text
-        text = page.inner_text("body")
-        match = re.search(r'([\d,]+)\s+sold items matching', text)
+        # Look for "X,XXX sold items matching" text; only ask the browser
+        # for the rendered body text if markup splits it up in the HTML
+        match = TOTAL_RE.search(html) or TOTAL_RE.search(await page.inner_text("body"))
         if match:
             return int(match.group(1).replace(',', ''))
     except:
@@ -265,95 +346,112 @@ def get_total_results(page: Page) -> int:
     return 0
 
 
-def scrape_material(page: Page, slug: str, config: dict, session_cookie: str) -> list[dict]:
-    """Scrape all listings for a material."""
-    all_results = []
-    seen_titles = set()
+async def wait_for_render(page: Page):
+    """Wait for the page's network to settle after navigation."""
+    try:
+        await page.wait_for_load_state("networkidle", timeout=8000)
+    except:
+        pass  # Trackers can keep the network busy; the checks below still run
+    if PARANOID:
+        await asyncio.sleep(2)  # Old fixed wait for JS rendering
+
+
+async def scrape_material(page: Page, slug: str, config: dict, session_cookie: str, writer) -> tuple[int, list[float]]:
+    """
+    Scrape all listings for a material, writing each page's rows to writer.
+    Materials run concurrently, so each progress line is prefixed with the slug.
+    Returns (rows written, price-per-gram values for the stats).
+    """
+    loop = asyncio.get_running_loop()
+    row_count = 0
+    prices_per_gram = []
+    seen_token = f"{slug}:{os.urandom(4).hex()}"  # names this scrape's seen-title set in the page
+    tag = f"  [{slug}]"
 
     for query in config["queries"]:
-        print(f"  Searching: '{query}'")
+        print(f"{tag} Searching: '{query}'")
         offset = 0
         consecutive_empty = 0
 
         while offset < MAX_PAGES * 20:
             url = build_url(query, offset, config.get("category"))
-            print(f"    Offset {offset}...", end=" ", flush=True)
+            status = f"{tag} Offset {offset}..."
 
             try:
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                time.sleep(2)  # Extra wait for JS rendering
+                await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                await wait_for_render(page)
             except Exception as e:
-                print(f"navigation error: {e}")
+                print(f"{status} navigation error: {e}")
                 break
 
+            # Fetch the DOM once and run every string check against it
+            html = await page.content()
+            content = html.lower()
+
             # Check for CAPTCHA mid-scraping
-            if "please verify you are a human" in page.content().lower():
-                print("CAPTCHA - solve it in browser...", end=" ", flush=True)
-                if not wait_for_captcha_solved(page):
-                    print("timed out")
-                    return all_results
-                print("OK")
+            if "please verify you are a human" in content:
+                print(f"{status} CAPTCHA - solve it in browser...")
+                if not await wait_for_captcha_solved(page, content=content):
+                    print(f"{tag} CAPTCHA timed out")
+                    return row_count, prices_per_gram
+                print(f"{tag} CAPTCHA OK")
                 # Retry the navigation
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                time.sleep(2)
+                await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+                await wait_for_render(page)
+                html = await page.content()
+                content = html.lower()
 
             # Check if logged in
-            if "sign in" in page.content().lower() and "my worthpoint" not in page.content().lower():
-                print("SESSION EXPIRED - please get fresh cookie")
-                return all_results
-
-            # Get total on first page
-            if offset == 0:
-                total = get_total_results(page)
-                search_results = page.query_selector_all(".search-result")
-                print(f"(found {len(search_results)} items on page, {total} total)")
-                if total == 0 and len(search_results) == 0:
-                    # Debug: save page content
-                    with open("debug_page.html", "w") as f:
-                        f.write(page.content())
-                    print("    Saved debug_page.html for inspection")
-                    break
-
-            # Wait for search results to load
-            try:
-                page.wait_for_selector(".search-result", timeout=10000)
-            except:
-                pass  # May timeout if no results
+            if "sign in" in content and "my worthpoint" not in content:
+                print(f"{status} SESSION EXPIRED - please get fresh cookie")
+                return row_count, prices_per_gram
 
-            # Scroll down to trigger lazy loading of price/date elements
-            page.evaluate("window.scrollTo(0, 500)")
-            time.sleep(1)
-            page.evaluate("window.scrollTo(0, 0)")
-            time.sleep(1)
+            if PARANOID:
+                # Scroll down to trigger lazy loading of price/date elements
+                await page.evaluate("window.scrollTo(0, 500)")
+                await asyncio.sleep(1)
+                await page.evaluate("window.scrollTo(0, 0)")
 
             # Wait for price elements specifically
             try:
-                page.wait_for_selector(".search-result .price", timeout=5000)
+                await page.wait_for_function(
+                    "document.querySelectorAll('.search-result .price .result').length > 0",
+                    timeout=8000,
+                )
             except:
-                pass
+                pass  # May timeout if no results
 
             # Extract listings (debug on first page)
-            listings = extract_listings_from_page(page, debug=(offset == 0))
+            listings, listing_count, card_count = await extract_listings_from_page(page, seen_token, debug=(offset == 0))
+            # Processing and writing this page count toward the delay before the next one
+            next_page_at = loop.time() + DELAY_BETWEEN_PAGES
 
-            if not listings:
-                print("no listings found")
+            # Get total on first page; the card count came back with the listings
+            if offset == 0:
+                total = await get_total_results(page, html)
+                print(f"{status} (found {card_count} items on page, {total} total)")
+                if total == 0 and card_count == 0:
+                    # Debug: save page content
+                    debug_file = f"debug_page_{slug}.html"
+                    with open(debug_file, "w") as f:
+                        f.write(html)
+                    print(f"{tag} Saved {debug_file} for inspection")
+                    break
+
+            if not listing_count:
+                print(f"{status} no listings found")
                 consecutive_empty += 1
                 if consecutive_empty >= 2:
                     break
                 offset += 20
-                time.sleep(DELAY_BETWEEN_PAGES)
+                await asyncio.sleep(DELAY_BETWEEN_PAGES)
                 continue
 
             consecutive_empty = 0
-            new_count = 0
+            rows = []
 
+            # Already deduplicated in the page
             for listing in listings:
-                # Deduplicate
-                title_key = listing["title"].lower()[:60]
-                if title_key in seen_titles:
-                    continue
-                seen_titles.add(title_key)
-
                 # Parse price
                 price_str = listing["price"].replace("$", "").replace(",", "")
                 try:
@@ -368,75 +466,91 @@ def scrape_material(page: Page, slug: str, config: dict, session_cookie: str) ->
                 weight = extract_weight(listing["title"])
                 price_per_gram = round(price / weight, 2) if weight and weight > 0 else None
 
-                all_results.append({
-                    "material_slug": slug,
-                    "title": listing["title"],
-                    "price_usd": price,
-                    "sale_date": date,
-                    "weight_grams": weight,
-                    "price_per_gram": price_per_gram,
-                    "source": "WorthPoint",
-                })
-                new_count += 1
+                rows.append((slug, listing["title"], price, date, weight, price_per_gram, "WorthPoint"))
+                if price_per_gram:
+                    prices_per_gram.append(price_per_gram)
 
-            print(f"{new_count} new")
+            # Written as we go so a crash or CAPTCHA timeout keeps what was scraped
+            writer.writerows(rows)
+            row_count += len(rows)
+            print(f"{status} {len(rows)} new")
 
             # Check if we've reached the end
-            if len(listings) < 20:
-                print(f"    End of results (got {len(listings)} < 20)")
+            if listing_count < 20:
+                print(f"{tag} End of results (got {listing_count} < 20)")
                 break
 
             offset += 20
-            time.sleep(DELAY_BETWEEN_PAGES)
+            await asyncio.sleep(max(0, next_page_at - loop.time()))
 
-    return all_results
+    return row_count, prices_per_gram
 
 
-def save_csv(slug: str, data: list[dict]):
-    """Save results to CSV."""
-    if not data:
-        print(f"  No data to save for {slug}")
-        return
+CSV_FIELDS = ("material_slug", "title", "price_usd", "sale_date",
+              "weight_grams", "price_per_gram", "source")
+
 
+@contextlib.contextmanager
+def open_csv_writer(slug: str):
+    """
+    Yield a csv.writer for the material's CSV so rows are written as scraped.
+    Rows go to a .part file that replaces the CSV once scraping finishes; if
+    the run dies part-way the .part file keeps whatever was scraped. A scrape
+    with no rows leaves any existing CSV untouched.
+    """
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     filepath = os.path.join(OUTPUT_DIR, f"{slug}.csv")
+    part_path = filepath + ".part"
 
-    fieldnames = ["material_slug", "title", "price_usd", "sale_date",
-                  "weight_grams", "price_per_gram", "source"]
-
-    with open(filepath, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    with open(part_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        header_end = f.tell()
+        yield writer
+        has_rows = f.tell() > header_end
 
-    print(f"  Saved {len(data)} listings to {filepath}")
+    if has_rows:
+        os.replace(part_path, filepath)
+    else:
+        os.remove(part_path)
 
 
-def print_stats(data: list[dict]):
+def print_stats(prices_per_gram: list[float]):
     """Print summary statistics."""
-    prices_per_gram = [r["price_per_gram"] for r in data if r["price_per_gram"]]
     if prices_per_gram:
-        avg = sum(prices_per_gram) / len(prices_per_gram)
-        prices_per_gram.sort()
-        median = prices_per_gram[len(prices_per_gram) // 2]
+        # One pass for sum/min/max
+        total = 0.0
+        low = math.inf
+        high = -math.inf
+        for ppg in prices_per_gram:
+            total += ppg
+            if ppg < low:
+                low = ppg
+            if ppg > high:
+                high = ppg
+        avg = total / len(prices_per_gram)
+        median = statistics.median_high(prices_per_gram)
         print(f"  Stats: {len(prices_per_gram)} with weight data")
         print(f"  Median: ${median:.2f}/gram, Average: ${avg:.2f}/gram")
-        print(f"  Range: ${min(prices_per_gram):.2f} - ${max(prices_per_gram):.2f}/gram")
+        print(f"  Range: ${low:.2f} - ${high:.2f}/gram")
 
 
-def wait_for_captcha_solved(page: Page, timeout: int = 300) -> bool:
+async def wait_for_captcha_solved(page: Page, timeout: int = 300, content: str | None = None) -> bool:
     """Wait for user to solve CAPTCHA if present. Returns True if page is ready."""
     start_time = time.time()
 
     while time.time() - start_time < timeout:
-        content = page.content().lower()
+        # First pass reuses the caller's already-fetched (lowercased) HTML
+        if content is None:
+            content = (await page.content()).lower()
 
         # Check if CAPTCHA/block page is shown
         if "please verify you are a human" in content or "access to this page has been denied" in content:
             print("\n*** CAPTCHA DETECTED ***")
             print("Please solve the CAPTCHA in the browser window.")
             print(f"Waiting up to {timeout} seconds...")
-            time.sleep(3)
+            await asyncio.sleep(3)
+            content = None
             continue
 
         # Check if we're on a normal page
@@ -447,46 +561,82 @@ def wait_for_captcha_solved(page: Page, timeout: int = 300) -> bool:
         if "my worthpoint" in content or "worthopedia" in content:
             return True
 
-        time.sleep(2)
+        await asyncio.sleep(2)
+        content = None
 
     return False
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Scrape WorthPoint with Playwright")
-    parser.add_argument("--cookie", required=True, help="gc_session cookie value")
-    parser.add_argument("--material", help="Scrape single material (slug name)")
-    parser.add_argument("--all", action="store_true", help="Scrape all materials")
-    parser.add_argument("--delay", type=int, default=3, help="Delay between pages (seconds)")
-    parser.add_argument("--headless", action="store_true", help="Run headless (may trigger bot detection)")
-    parser.add_argument("--visible", action="store_true", default=True, help="Show browser window (default, recommended)")
-    args = parser.parse_args()
-
-    global DELAY_BETWEEN_PAGES
-    DELAY_BETWEEN_PAGES = args.delay
+def is_worthpoint_host(url: str) -> bool:
+    """True if url is served from worthpoint.com or one of its subdomains."""
+    host = urlsplit(url).hostname or ""
+    return host == "worthpoint.com" or host.endswith(".worthpoint.com")
 
-    # Default to visible mode to handle CAPTCHA
-    headless = args.headless and not args.visible
 
-    # Determine materials to scrape
-    if args.material:
-        if args.material not in MATERIALS:
-            print(f"Unknown material: {args.material}")
-            print(f"Available: {', '.join(MATERIALS.keys())}")
-            return
-        materials_to_scrape = {args.material: MATERIALS[args.material]}
-    elif args.all:
-        materials_to_scrape = MATERIALS
+async def block_heavy_resources(route):
+    """Abort requests for images, fonts, media and third-party stylesheets."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or (
+        request.resource_type == "stylesheet" and not is_worthpoint_host(request.url)
+    ):
+        await route.abort()
     else:
-        print("Specify --material <slug> or --all")
-        print(f"Available materials: {', '.join(MATERIALS.keys())}")
-        return
+        await route.continue_()
 
-    print(f"Starting Playwright (headless={headless})...")
 
-    with sync_playwright() as p:
+async def setup_context(browser, cookie: str, storage_state: dict | None = None):
+    """
+    Create a browser context carrying the session cookie and stealth patches. Returns (context, page).
+    Pass storage_state from an already verified context to reuse its cookies
+    (session plus any CAPTCHA clearance) instead of just the session cookie.
+    """
+    # Create context with realistic browser fingerprint
+    context = await browser.new_context(
+        user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        viewport={"width": 1920, "height": 1080},
+        locale="en-US",
+        timezone_id="America/New_York",
+        storage_state=storage_state,
+    )
+
+    # Set the session cookie
+    if storage_state is None:
+        await context.add_cookies([{
+            "name": "gc_session",
+            "value": cookie,
+            "domain": ".worthpoint.com",
+            "path": "/",
+        }])
+
+    # Remove webdriver flag
+    await context.add_init_script("""
+        Object.defineProperty(navigator, 'webdriver', {
+            get: () => undefined
+        });
+    """)
+
+    # Resource types are only known per request, so this has to see every URL.
+    # Any route disables Playwright's HTTP cache for the context; each search
+    # page is fetched once anyway, and the blocked assets dominate the bytes
+    await context.route("**/*", block_heavy_resources)
+
+    # Install the listing extractor once per document
+    await context.add_init_script(f"window.__extractListings = {EXTRACT_LISTINGS_JS};")
+
+    page = await context.new_page()
+
+    # Apply stealth mode to avoid detection
+    stealth = Stealth()
+    await stealth.apply_stealth_async(page)
+
+    return context, page
+
+
+async def run(args, materials_to_scrape: dict, headless: bool):
+    """Check the session, then scrape materials concurrently from a pool of warm contexts."""
+    async with async_playwright() as p:
         # Launch with stealth settings to avoid bot detection
-        browser = p.chromium.launch(
+        browser = await p.chromium.launch(
             headless=headless,
             args=[
                 "--disable-blink-features=AutomationControlled",
@@ -495,73 +645,117 @@ def main():
             ]
         )
 
-        # Create context with realistic browser fingerprint
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            viewport={"width": 1920, "height": 1080},
-            locale="en-US",
-            timezone_id="America/New_York",
-        )
-
-        # Set the session cookie
-        context.add_cookies([{
-            "name": "gc_session",
-            "value": args.cookie,
-            "domain": ".worthpoint.com",
-            "path": "/",
-        }])
-
-        # Remove webdriver flag
-        context.add_init_script("""
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined
-            });
-        """)
-
-        page = context.new_page()
-
-        # Apply stealth mode to avoid detection
-        stealth = Stealth()
-        stealth.apply_stealth_sync(page)
+        context, page = await setup_context(browser, args.cookie)
 
         # Test connection
         print("Testing connection...")
         print("NOTE: If a CAPTCHA appears, please solve it in the browser window.")
         print()
-        page.goto("https://www.worthpoint.com/worthopedia", wait_until="domcontentloaded", timeout=60000)
-        time.sleep(2)  # Wait for JS
+        await page.goto("https://www.worthpoint.com/worthopedia", wait_until="domcontentloaded", timeout=60000)
+        await wait_for_render(page)
 
         # Check for CAPTCHA and wait if needed
-        if "please verify you are a human" in page.content().lower():
+        content = (await page.content()).lower()
+        if "please verify you are a human" in content:
             print("CAPTCHA detected - please solve it in the browser...")
-            if not wait_for_captcha_solved(page):
+            if not await wait_for_captcha_solved(page, content=content):
                 print("ERROR: Timed out waiting for CAPTCHA")
-                browser.close()
+                await browser.close()
                 return
+            content = (await page.content()).lower()
 
-        if "sign in" in page.content().lower() and "my worthpoint" not in page.content().lower():
+        if "sign in" in content and "my worthpoint" not in content:
             print("ERROR: Session cookie is invalid or expired")
             print("Please get a fresh gc_session cookie from your browser")
-            browser.close()
+            await browser.close()
             return
 
         print("Connection OK - session is valid\n")
 
-        # Scrape each material
-        for slug, config in materials_to_scrape.items():
-            print(f"{'='*50}")
-            print(f"Scraping: {slug}")
-            print(f"{'='*50}")
+        # Contexts are set up once and checked out per material; the pool
+        # size also bounds how many materials hit the site at once. Extra
+        # contexts copy the verified one's cookies, CAPTCHA clearance included
+        pool = asyncio.Queue()
+        pool.put_nowait((context, page))
+        extra_contexts = min(MAX_CONCURRENCY, len(materials_to_scrape)) - 1
+        if extra_contexts > 0:
+            verified_state = await context.storage_state()
+            for _ in range(extra_contexts):
+                pool.put_nowait(await setup_context(browser, args.cookie, storage_state=verified_state))
+
+        async def bounded(slug: str, config: dict):
+            context, page = await pool.get()
+            try:
+                print(f"Scraping: {slug}")
+                with open_csv_writer(slug) as writer:
+                    row_count, prices_per_gram = await scrape_material(page, slug, config, args.cookie, writer)
+
+                print(f"{'='*50}")
+                print(f"Finished: {slug}")
+                print(f"{'='*50}")
+                if row_count:
+                    print(f"  Saved {row_count} listings to {os.path.join(OUTPUT_DIR, f'{slug}.csv')}")
+                else:
+                    print(f"  No data to save for {slug}")
+                print_stats(prices_per_gram)
+
+                # Longer delay before this page picks up the next material
+                if len(materials_to_scrape) > MAX_CONCURRENCY:
+                    await page.goto("about:blank")
+                    await asyncio.sleep(DELAY_BETWEEN_PAGES * 2)
+            finally:
+                pool.put_nowait((context, page))
+
+        outcomes = await asyncio.gather(
+            *(bounded(slug, config) for slug, config in materials_to_scrape.items()),
+            return_exceptions=True,
+        )
+        for slug, outcome in zip(materials_to_scrape, outcomes):
+            if isinstance(outcome, BaseException):
+                print(f"  ERROR scraping {slug}: {outcome}")
+
+        await browser.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape WorthPoint with Playwright")
+    parser.add_argument("--cookie", required=True, help="gc_session cookie value")
+    parser.add_argument("--material", help="Scrape single material (slug name)")
+    parser.add_argument("--all", action="store_true", help="Scrape all materials")
+    parser.add_argument("--delay", type=int, default=3, help="Delay between pages (seconds)")
+    parser.add_argument("--concurrency", type=int, default=3,
+                        help="Browser contexts / materials scraped in parallel (default: 3)")
+    parser.add_argument("--paranoid", action="store_true",
+                        help="Add fixed render waits and a scroll nudge if prices come back empty")
+    parser.add_argument("--headless", action="store_true", help="Run headless (may trigger bot detection)")
+    parser.add_argument("--visible", action="store_true", default=True, help="Show browser window (default, recommended)")
+    args = parser.parse_args()
+
+    global DELAY_BETWEEN_PAGES, MAX_CONCURRENCY, PARANOID
+    DELAY_BETWEEN_PAGES = args.delay
+    MAX_CONCURRENCY = max(1, args.concurrency)
+    PARANOID = args.paranoid
 
-            results = scrape_material(page, slug, config, args.cookie)
-            save_csv(slug, results)
-            print_stats(results)
+    # Default to visible mode to handle CAPTCHA
+    headless = args.headless and not args.visible
+
+    # Determine materials to scrape
+    if args.material:
+        if args.material not in MATERIALS:
+            print(f"Unknown material: {args.material}")
+            print(f"Available: {', '.join(MATERIALS.keys())}")
+            return
+        materials_to_scrape = {args.material: MATERIALS[args.material]}
+    elif args.all:
+        materials_to_scrape = MATERIALS
+    else:
+        print("Specify --material <slug> or --all")
+        print(f"Available materials: {', '.join(MATERIALS.keys())}")
+        return
 
-            # Longer delay between materials
-            if len(materials_to_scrape) > 1:
-                time.sleep(DELAY_BETWEEN_PAGES * 2)
+    print(f"Starting Playwright (headless={headless})...")
 
-        browser.close()
+    asyncio.run(run(args, materials_to_scrape, headless))
 
     print(f"\n{'='*50}")
     print(f"Done! CSV files saved to {OUTPUT_DIR}/")
@@ -12,40 +12,103 @@ SETUP:
 
 Usage:
     python3 worthpoint-remote-scraper.py --material "Darwin Glass"
+    python3 worthpoint-remote-scraper.py --materials "Darwin Glass" "Trinitite"
 """
 
 import re
+import statistics
 import csv
-import time
+import asyncio
 import argparse
 import os
+import functools
+import operator
+import types
+import inspect
 from datetime import datetime
-from urllib.parse import quote
-from playwright.sync_api import sync_playwright
+from urllib.parse import quote, urlsplit
+from playwright.async_api import async_playwright
+
+
+def disable_playwright_stack_capture():
+    """
+    Stop Playwright calling inspect.stack() per API call (opt in with PW_FAST_STACKS=1).
+
+    Patches a private Playwright module: error messages and traces lose their
+    apiName and call-site stack. Does nothing if those internals have moved.
+    """
+    if os.environ.get("PW_FAST_STACKS", "0") == "0":
+        return
+    try:
+        from playwright._impl import _connection
+        _connection.inspect.stack  # AttributeError if the internals have moved
+        fast_inspect = types.ModuleType("inspect")
+        fast_inspect.__dict__.update(inspect.__dict__)
+        fast_inspect.stack = lambda *args, **kwargs: []
+        _connection.inspect = fast_inspect
+    except (ImportError, AttributeError):
+        return
+
+
+disable_playwright_stack_capture()
 
 OUTPUT_DIR = os.path.expanduser("~/lithos/scripts/worthpoint-data")
 DELAY_BETWEEN_PAGES = 3
 MAX_PAGES = 200
 
+SEARCH_URL = (
+    "https://www.worthpoint.com/inventory/search"
+    "?query={query}"
+    "&offset={offset}"
+    "&max=20"
+    "&sort=SaleDate"
+    "&img=true"
+    "&noGreyList=true"
+    "&saleDate=ALL_TIME"
+)
+
+# Only text is read from the results, so skip downloading these
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+# (unit, multiplier to grams) in priority order; "gr" is a g match spelled "gr..."
+WEIGHT_UNITS = (
+    ("g", 1.0),
+    ("g_dash", 1.0),
+    ("gr", 1.0),
+    ("ct", 0.2),
+    ("oz", 28.35),
+    ("kg", 1000.0),
+)
+# A number followed by a unit; the named group that matched identifies the unit
+WEIGHT_RE = re.compile(
+    r'(\d+\.?\d*)(?:\s*(?:'
+    r'(?P<g>g(?:rams?)?)'
+    r'|(?P<ct>ct)'
+    r'|(?P<oz>oz)'
+    r'|(?P<kg>kg)'
+    r')|-(?P<g_dash>g(?:rams?)?))',
+    re.IGNORECASE,
+)
+
 
 def extract_weight(title: str) -> float | None:
-    patterns = [
-        (r'(\d+\.?\d*)\s*[Gg](?:rams?)?', 1.0),
-        (r'(\d+\.?\d*)-[Gg](?:rams?)?', 1.0),
-        (r'(\d+\.?\d*)\s*[Gg]r\.?', 1.0),
-        (r'(\d+\.?\d*)\s*ct', 0.2),
-        (r'(\d+\.?\d*)\s*oz', 28.35),
-        (r'(\d+\.?\d*)\s*kg', 1000.0),
-    ]
-    for pattern, multiplier in patterns:
-        match = re.search(pattern, title, re.IGNORECASE)
-        if match:
-            weight = float(match.group(1)) * multiplier
+    # One scan records the first match per unit, then units are tried in priority order
+    found = {}
+    for match in WEIGHT_RE.finditer(title):
+        unit = match.lastgroup
+        found.setdefault(unit, match.group(1))
+        if unit == "g" and title.startswith(("r", "R"), match.start("g") + 1):
+            found.setdefault("gr", match.group(1))
+    for unit, multiplier in WEIGHT_UNITS:
+        if unit in found:
+            weight = float(found[unit]) * multiplier
             if 0.01 < weight < 100000:
                 return round(weight, 3)
     return None
 
 
+# Sale dates repeat heavily across listings, so parse each distinct string once
+@functools.lru_cache(maxsize=2048)
 def parse_date(date_str: str) -> str | None:
     if not date_str:
         return None
@@ -60,58 +123,105 @@ def parse_date(date_str: str) -> str | None:
 
 
 def build_url(query: str, offset: int = 0) -> str:
-    encoded = quote(f'"{query}"')
-    return (
-        f"https://www.worthpoint.com/inventory/search"
-        f"?query={encoded}"
-        f"&offset={offset}"
-        f"&max=20"
-        f"&sort=SaleDate"
-        f"&img=true"
-        f"&noGreyList=true"
-        f"&saleDate=ALL_TIME"
-    )
-
-
-def extract_listings(page, material_filter: str) -> list[dict]:
-    """Extract listings using confirmed selectors."""
-    js_code = """
-    () => {
-        const results = [];
-        const cards = document.querySelectorAll('li.search-result');
-
-        cards.forEach(card => {
-            const titleEl = card.querySelector('.product-title');
-            const title = titleEl ? titleEl.textContent.trim() : '';
-
-            const priceEl = card.querySelector('.price .result');
-            const price = priceEl ? (priceEl.getAttribute('title') || priceEl.textContent).trim() : '';
-
-            const dateEl = card.querySelector('.sold-date .result');
-            const date = dateEl ? dateEl.textContent.trim() : '';
-
-            if (title && price) {
-                results.push({ title, price, date });
-            }
-        });
-
-        return results;
+    return SEARCH_URL.format(query=quote(f'"{query}"'), offset=offset)
+
+
+# Installed into the tab as window.__extractListings by an init script so
+# each page only sends a short call instead of the whole source
+EXTRACT_LISTINGS_JS = """
+([filter, token]) => {
+    // 53-bit cyrb53 hash of a title key, compact enough to keep every seen title
+    function hashKey(str) {
+        let h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+        for (let c = 0; c < str.length; c++) {
+            const ch = str.charCodeAt(c);
+            h1 = Math.imul(h1 ^ ch, 2654435761);
+            h2 = Math.imul(h2 ^ ch, 1597334677);
+        }
+        h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+        h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+        return 4294967296 * (2097151 & h2) + (h1 >>> 0);
     }
+
+    // Seen title hashes live in this tab's sessionStorage, which survives the
+    // navigation to each results page, so they never cross the CDP bridge.
+    // A new token (one per material scrape) starts an empty set.
+    const stored = JSON.parse(sessionStorage.getItem('__lithosSeen') || 'null');
+    const seen = new Set(stored && stored.token === token ? stored.keys : []);
+
+    const results = [];
+    let matched = 0;
+    const cards = document.querySelectorAll('li.search-result');
+
+    cards.forEach(card => {
+        const titleEl = card.querySelector('.product-title');
+        const title = titleEl ? titleEl.textContent.trim() : '';
+
+        const priceEl = card.querySelector('.price .result');
+        const price = priceEl ? (priceEl.getAttribute('title') || priceEl.textContent).trim() : '';
+
+        const dateEl = card.querySelector('.sold-date .result');
+        const date = dateEl ? dateEl.textContent.trim() : '';
+
+        if (!title || !price) return;
+        const lower = title.toLowerCase();
+        if (!lower.includes(filter)) return;
+        matched++;
+
+        const key = hashKey(lower.slice(0, 60));
+        if (seen.has(key)) return;
+        seen.add(key);
+        results.push({ title, price, date });
+    });
+
+    sessionStorage.setItem('__lithosSeen', JSON.stringify({ token, keys: Array.from(seen) }));
+
+    return { results, matched, priceCount: document.querySelectorAll('.price .result').length };
+}
+"""
+
+
+async def extract_listings(page, material_filter: str, seen_token: str) -> tuple[list[dict], int, int | None]:
+    """
+    Extract listings using confirmed selectors.
+    Filtering and title dedup against the tab's seen-title set for seen_token
+    (hashes of the lowercased first 60 title chars) run in the page; a new
+    token starts fresh.
+    Returns (new matching listings, matching count before dedup, number of
+    price elements on the page); the price count is None if extraction failed.
     """
     try:
-        listings = page.evaluate(js_code)
-        filter_lower = material_filter.lower()
-        return [l for l in listings if filter_lower in l['title'].lower()]
+        extracted = await page.evaluate(
+            "(args) => window.__extractListings(args)", [material_filter.lower(), seen_token]
+        )
+        listings = extracted['results']
+        return listings, extracted['matched'], extracted['priceCount']
     except Exception as e:
         print(f"    Error: {e}")
-        return []
+        return [], 0, None
+
 
+def is_worthpoint_host(url: str) -> bool:
+    """True if url is served from worthpoint.com or one of its subdomains."""
+    host = urlsplit(url).hostname or ""
+    return host == "worthpoint.com" or host.endswith(".worthpoint.com")
 
-def has_next_page(page) -> bool:
+
+async def block_heavy_resources(route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or (
+        request.resource_type == "stylesheet" and not is_worthpoint_host(request.url)
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def has_next_page(page) -> bool:
     try:
-        next_btn = page.query_selector('a.nextLink')
+        next_btn = await page.query_selector('a.nextLink')
         if next_btn:
-            classes = next_btn.get_attribute('class') or ''
+            classes = await next_btn.get_attribute('class') or ''
             return 'disabled' not in classes
     except:
         pass
@@ -129,39 +239,134 @@ def save_csv(slug: str, data: list[dict]):
     fieldnames = ["material_slug", "title", "price_usd", "sale_date",
                   "weight_grams", "price_per_gram", "source"]
 
+    # Plain tuples via itemgetter instead of DictWriter's per-field lookups
+    get_row = operator.itemgetter(*fieldnames)
     with open(filepath, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows(map(get_row, data))
 
     print(f"  Saved {len(data)} listings to {filepath}")
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--material", required=True, help="Material to search")
-    parser.add_argument("--delay", type=int, default=3)
-    args = parser.parse_args()
+async def scrape_material(page, material: str) -> list[dict]:
+    """
+    Scrape all result pages for one material in the connected tab.
+    Listing processing overlaps the next-page check and counts toward the
+    delay between pages instead of being added on top of it.
+    """
+    loop = asyncio.get_running_loop()
+    slug = material.lower().replace(" ", "-")
+    results = []
+    seen_token = f"{material}:{os.urandom(4).hex()}"  # names this scrape's seen-title set in the page
 
-    global DELAY_BETWEEN_PAGES
-    DELAY_BETWEEN_PAGES = args.delay
+    offset = 0
+    page_num = 0
+    consecutive_empty = 0
 
-    material = args.material
-    slug = material.lower().replace(" ", "-")
+    while page_num < MAX_PAGES:
+        page_num += 1
+        url = build_url(material, offset)
 
-    print("=" * 50)
-    print(f"WorthPoint Scraper - {material}")
-    print("=" * 50)
-    print()
-    print("Connecting to Chrome on port 9222...")
-    print()
+        print(f"Page {page_num} (offset {offset})...", end=" ", flush=True)
 
-    results = []
-    seen = set()
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+            await asyncio.sleep(2)
+        except Exception as e:
+            print(f"error: {e}")
+            break
+
+        # Check for issues
+        content = (await page.content()).lower()
+        if "please verify you are a human" in content:
+            print("\nCAPTCHA! Solve it in the browser, then press Enter...")
+            await asyncio.to_thread(input)
+            await page.reload()
+            await asyncio.sleep(2)
+
+        # Wait for results
+        try:
+            await page.wait_for_selector("li.search-result", timeout=10000)
+        except:
+            print("no results")
+            consecutive_empty += 1
+            if consecutive_empty >= 2:
+                break
+            offset += 20
+            await asyncio.sleep(DELAY_BETWEEN_PAGES)
+            continue
 
-    with sync_playwright() as p:
+        # Price element count comes back with the listings in one round-trip
+        listings, matched, price_count = await extract_listings(page, material, seen_token)
+        next_page_at = loop.time() + DELAY_BETWEEN_PAGES
+
+        # Debug: check if price elements exist
+        if price_count == 0:
+            print(f"0 price elements (bot detection active)")
+            consecutive_empty += 1
+            if consecutive_empty >= 2:
+                print("  Bot detection blocking prices - try the console script instead")
+                break
+            offset += 20
+            await asyncio.sleep(DELAY_BETWEEN_PAGES)
+            continue
+
+        if not matched:
+            print(f"0 matching")
+            consecutive_empty += 1
+            if consecutive_empty >= 2:
+                break
+            offset += 20
+            await asyncio.sleep(DELAY_BETWEEN_PAGES)
+            continue
+
+        consecutive_empty = 0
+        new_count = 0
+
+        # Ask for the next-page link while this page's listings are processed
+        has_next = asyncio.create_task(has_next_page(page))
+        await asyncio.sleep(0)  # let the task send its request first
+
+        for listing in listings:
+            price_str = listing["price"].replace("$", "").replace(",", "")
+            try:
+                price = float(price_str)
+            except:
+                continue
+
+            date = parse_date(listing["date"])
+            weight = extract_weight(listing["title"])
+            ppg = round(price / weight, 2) if weight and weight > 0 else None
+
+            results.append({
+                "material_slug": slug,
+                "title": listing["title"],
+                "price_usd": price,
+                "sale_date": date,
+                "weight_grams": weight,
+                "price_per_gram": ppg,
+                "source": "WorthPoint",
+            })
+            new_count += 1
+
+        print(f"{new_count} new (total: {len(results)})")
+
+        if not await has_next:
+            print("  Last page")
+            break
+
+        offset += 20
+        await asyncio.sleep(max(0, next_page_at - loop.time()))
+
+    return results
+
+
+async def run(args):
+    """Attach to the running Chrome and scrape each material in one tab."""
+    async with async_playwright() as p:
         try:
-            browser = p.chromium.connect_over_cdp("http://localhost:9222")
+            browser = await p.chromium.connect_over_cdp("http://localhost:9222")
         except Exception as e:
             print(f"ERROR: Could not connect to Chrome: {e}")
             print()
@@ -184,124 +389,64 @@ def main():
         if pages:
             page = pages[0]
         else:
-            page = context.new_page()
+            page = await context.new_page()
 
         print(f"Connected! Using page: {page.url}")
         print()
 
-        offset = 0
-        page_num = 0
-        consecutive_empty = 0
-
-        while page_num < MAX_PAGES:
-            page_num += 1
-            url = build_url(material, offset)
+        # Only for this tab and only while scraping - it's the user's browser.
+        # Resource types are only known per request, so this sees every URL;
+        # routing also bypasses the HTTP cache for the tab until unroute
+        await page.route("**/*", block_heavy_resources)
 
-            print(f"Page {page_num} (offset {offset})...", end=" ", flush=True)
+        # Defines the extractor in every document this tab loads from now on
+        await page.add_init_script(f"window.__extractListings = {EXTRACT_LISTINGS_JS};")
 
-            try:
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                time.sleep(2)
-            except Exception as e:
-                print(f"error: {e}")
-                break
-
-            # Check for issues
-            content = page.content().lower()
-            if "please verify you are a human" in content:
-                print("\nCAPTCHA! Solve it in the browser, then press Enter...")
-                input()
-                page.reload()
-                time.sleep(2)
-
-            # Wait for results
-            try:
-                page.wait_for_selector("li.search-result", timeout=10000)
-            except:
-                print("no results")
-                consecutive_empty += 1
-                if consecutive_empty >= 2:
-                    break
-                offset += 20
-                time.sleep(DELAY_BETWEEN_PAGES)
-                continue
-
-            # Debug: check if price elements exist
-            price_count = page.evaluate("document.querySelectorAll('.price .result').length")
-            if price_count == 0:
-                print(f"0 price elements (bot detection active)")
-                consecutive_empty += 1
-                if consecutive_empty >= 2:
-                    print("  Bot detection blocking prices - try the console script instead")
-                    break
-                offset += 20
-                time.sleep(DELAY_BETWEEN_PAGES)
-                continue
-
-            listings = extract_listings(page, material)
+        # One CDP connection and tab for every requested material
+        try:
+            for i, material in enumerate(args.materials):
+                if i > 0:
+                    await asyncio.sleep(DELAY_BETWEEN_PAGES * 2)
+
+                print("=" * 50)
+                print(f"WorthPoint Scraper - {material}")
+                print("=" * 50)
+                print()
+
+                results = await scrape_material(page, material)
+
+                print()
+                save_csv(material.lower().replace(" ", "-"), results)
+
+                if results:
+                    ppg_list = [r["price_per_gram"] for r in results if r["price_per_gram"]]
+                    if ppg_list:
+                        median = statistics.median_high(ppg_list)
+                        avg = sum(ppg_list) / len(ppg_list)
+                        print(f"  {len(ppg_list)} with weight | Median: ${median:.2f}/g | Avg: ${avg:.2f}/g")
+                print()
+        finally:
+            # Give the user their tab back even if a material fails or is interrupted
+            await page.unroute("**/*", block_heavy_resources)
 
-            if not listings:
-                print(f"0 matching")
-                consecutive_empty += 1
-                if consecutive_empty >= 2:
-                    break
-                offset += 20
-                time.sleep(DELAY_BETWEEN_PAGES)
-                continue
+        # Don't close browser - user may want to keep using it
 
-            consecutive_empty = 0
-            new_count = 0
-
-            for listing in listings:
-                title_key = listing["title"].lower()[:60]
-                if title_key in seen:
-                    continue
-                seen.add(title_key)
-
-                price_str = listing["price"].replace("$", "").replace(",", "")
-                try:
-                    price = float(price_str)
-                except:
-                    continue
-
-                date = parse_date(listing["date"])
-                weight = extract_weight(listing["title"])
-                ppg = round(price / weight, 2) if weight and weight > 0 else None
-
-                results.append({
-                    "material_slug": slug,
-                    "title": listing["title"],
-                    "price_usd": price,
-                    "sale_date": date,
-                    "weight_grams": weight,
-                    "price_per_gram": ppg,
-                    "source": "WorthPoint",
-                })
-                new_count += 1
-
-            print(f"{new_count} new (total: {len(results)})")
-
-            if not has_next_page(page):
-                print("  Last page")
-                break
 
-            offset += 20
-            time.sleep(DELAY_BETWEEN_PAGES)
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--materials", "--material", nargs="+", required=True,
+                        help="Material(s) to search")
+    parser.add_argument("--delay", type=int, default=3)
+    args = parser.parse_args()
 
-        # Don't close browser - user may want to keep using it
+    global DELAY_BETWEEN_PAGES
+    DELAY_BETWEEN_PAGES = args.delay
 
+    print("Connecting to Chrome on port 9222...")
     print()
-    save_csv(slug, results)
 
-    if results:
-        ppg_list = [r["price_per_gram"] for r in results if r["price_per_gram"]]
-        if ppg_list:
-            ppg_list.sort()
-            median = ppg_list[len(ppg_list) // 2]
-            avg = sum(ppg_list) / len(ppg_list)
-            print(f"  {len(ppg_list)} with weight | Median: ${median:.2f}/g | Avg: ${avg:.2f}/g")
+    asyncio.run(run(args))
 
-    print()
     print("Done!")
 
 
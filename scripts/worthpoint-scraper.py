@@ -13,18 +13,27 @@ Usage:
 """
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html as lxml_html
 import re
+import statistics
 import csv
+import contextlib
 import time
 import argparse
 import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
 from urllib.parse import quote_plus
 
 # Configuration
 OUTPUT_DIR = "./worthpoint-data"
 DELAY_BETWEEN_REQUESTS = 3  # seconds - be respectful
+MAX_CONCURRENT_REQUESTS = 4  # pages in flight; request starts stay DELAY / this apart
 MAX_PAGES_PER_MATERIAL = 50  # limit to avoid excessive requests
 
 # Materials to scrape with search terms
@@ -43,30 +52,92 @@ MATERIALS = {
     "indochinite": ["indochinite tektite", "indochinite"],
 }
 
+# Weight units in priority order, more specific first: (group name, multiplier to grams)
+WEIGHT_UNITS = (
+    ("g", 1.0),      # Grams: "5.2g", "5.2 g", "5.2 grams", "5.2gram", "5.2 gr"
+    ("ct", 0.2),     # Carats: "5.2ct", "5.2 carats" (1 carat = 0.2 grams)
+    ("kg", 1000.0),  # Kilograms: "1.5kg", "1.5 kg"
+    ("oz", 28.35),   # Ounces: "2oz", "2 oz" (1 oz = 28.35g)
+)
+# A number followed by a unit; the named group that matched identifies the unit
+WEIGHT_RE = re.compile(
+    r'(\d+\.?\d*)\s*(?:'
+    r'(?P<g>grams?|gr?)'
+    r'|(?P<ct>carats?|ct)'
+    r'|(?P<kg>kg)'
+    r'|(?P<oz>oz)'
+    r')\b'
+)
+PRICE_RE = re.compile(r'\$?\s*(\d+\.?\d*)')
+YEAR_RE = re.compile(r'20[12]\d')
+
+# Every character Unicode-mode \s matches, for patterns compiled with re.ASCII
+UNICODE_SPACE = r'[\s\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]'
+# Card text patterns: "Sold for: $XX.XX", "Sold Date: Jan 18, 2026" or "Sold Date: 01/18/2026".
+# Case-insensitive matching is about twice as fast in ASCII mode; spelling out the
+# Unicode spaces keeps &nbsp; and friends matching \s as before
+SOLD_PRICE_RE, SOLD_DATE_RE, SOLD_DATE_NUM_RE = (
+    re.compile(pattern.replace(r'\s', UNICODE_SPACE), re.IGNORECASE | re.ASCII)
+    for pattern in (
+        r'Sold\s+for:\s*\$?([\d,]+\.?\d*)',
+        r'Sold\s+Date:\s*([A-Za-z]+\s+\d+,?\s+\d{4})',
+        r'Sold\s+Date:\s*(\d{1,2}/\d{1,2}/\d{4})',
+    )
+)
+
+# strptime formats, and the subsets parse_date tries for each shape of date text
+DATE_FORMATS = (
+    "%B %d, %Y",      # January 15, 2023
+    "%b %d, %Y",      # Jan 15, 2023
+    "%m/%d/%Y",       # 01/15/2023
+    "%Y-%m-%d",       # 2023-01-15
+    "%d %B %Y",       # 15 January 2023
+    "%B %Y",          # January 2023 (use 1st of month)
+)
+SLASH_DATE_FORMATS = ("%m/%d/%Y",)
+DIGIT_DATE_FORMATS = ("%Y-%m-%d", "%d %B %Y")
+MONTH_DATE_FORMATS = ("%B %d, %Y", "%B %Y")
+# Three-letter months are usually abbreviations, but "May" is also a full name
+SHORT_MONTH_DATE_FORMATS = ("%b %d, %Y", "%B %d, %Y", "%B %Y")
+
+# Result count on the first page: "X,XXX sold items matching ..."
+TOTAL_RE = re.compile(r'([\d,]+)\s+sold items matching')
+
+# Logged-out pages offer "Sign in" without the "My Account" menu
+SIGN_IN_RE = re.compile(rb'sign in', re.IGNORECASE)
+MY_ACCOUNT_RE = re.compile(rb'my account', re.IGNORECASE)
+
+# Every element any of the listing card selectors could match, in document order
+CARD_CANDIDATES_XPATH = etree.XPath(
+    "//*[contains(@class, 'card') or contains(@class, 'search-result') or contains(@class, 'listing')]"
+    " | //article"
+)
+DIV_XPATH = etree.XPath("//div")
+# Title - usually in h2, h3, or first link: h2, h3, h4, a[href*="/worthopedia/"], .title, a
+TITLE_XPATHS = [etree.XPath(xpath) for xpath in (
+    "(.//h2)[1]",
+    "(.//h3)[1]",
+    "(.//h4)[1]",
+    "(.//a[contains(@href, '/worthopedia/')])[1]",
+    "(.//*[contains(concat(' ', normalize-space(@class), ' '), ' title ')])[1]",
+    "(.//a)[1]",
+)]
+TEXT_XPATH = etree.XPath(".//text()", smart_strings=False)
+
 
 def extract_weight_grams(title: str) -> float | None:
     """
     Extract weight in grams from listing title.
     Handles various formats: 5.2g, 5.2 grams, 5.2gram, 5.2 gr, 5.2ct (carats)
     """
-    title_lower = title.lower()
-
-    # Pattern priority: more specific first
-    patterns = [
-        # Grams: "5.2g", "5.2 g", "5.2 grams", "5.2gram"
-        (r'(\d+\.?\d*)\s*(?:grams?|gr?)\b', 1.0),
-        # Carats: "5.2ct", "5.2 carats" (1 carat = 0.2 grams)
-        (r'(\d+\.?\d*)\s*(?:carats?|ct)\b', 0.2),
-        # Kilograms: "1.5kg", "1.5 kg"
-        (r'(\d+\.?\d*)\s*kg\b', 1000.0),
-        # Ounces: "2oz", "2 oz" (1 oz = 28.35g)
-        (r'(\d+\.?\d*)\s*oz\b', 28.35),
-    ]
-
-    for pattern, multiplier in patterns:
-        match = re.search(pattern, title_lower)
-        if match:
-            weight = float(match.group(1)) * multiplier
+    # One scan records the first match per unit, then units are tried in priority order
+    found = {}
+    for match in WEIGHT_RE.finditer(title.lower()):
+        found.setdefault(match.lastgroup, match.group(1))
+
+    for unit, multiplier in WEIGHT_UNITS:
+        if unit in found:
+            weight = float(found[unit]) * multiplier
             # Sanity check - ignore unreasonable weights
             if 0.01 < weight < 100000:
                 return round(weight, 2)
@@ -78,7 +149,7 @@ def extract_price_usd(price_text: str) -> float | None:
     """Extract USD price from text like '$45.99' or '45.99 USD'"""
     # Remove commas and find price pattern
     price_text = price_text.replace(',', '')
-    match = re.search(r'\$?\s*(\d+\.?\d*)', price_text)
+    match = PRICE_RE.search(price_text)
     if match:
         price = float(match.group(1))
         if 0 < price < 1000000:  # sanity check
@@ -89,16 +160,21 @@ def extract_price_usd(price_text: str) -> float | None:
 def parse_date(date_text: str) -> str | None:
     """Parse various date formats to YYYY-MM-DD"""
     date_text = date_text.strip()
-
-    # Common formats
-    formats = [
-        "%B %d, %Y",      # January 15, 2023
-        "%b %d, %Y",      # Jan 15, 2023
-        "%m/%d/%Y",       # 01/15/2023
-        "%Y-%m-%d",       # 2023-01-15
-        "%d %B %Y",       # 15 January 2023
-        "%B %Y",          # January 2023 (use 1st of month)
-    ]
+    if not date_text:
+        return None
+
+    # Only try the formats this shape of text could match; each miss raises ValueError
+    if '/' in date_text:
+        formats = SLASH_DATE_FORMATS
+    elif date_text[:1].isdigit():
+        formats = DIGIT_DATE_FORMATS
+    elif date_text[3:4].isalpha():
+        # Month name longer than three letters
+        formats = MONTH_DATE_FORMATS
+    elif date_text[:1].isalpha():
+        formats = SHORT_MONTH_DATE_FORMATS
+    else:
+        formats = DATE_FORMATS
 
     for fmt in formats:
         try:
@@ -108,18 +184,73 @@ def parse_date(date_text: str) -> str | None:
             continue
 
     # Try to extract year at minimum
-    year_match = re.search(r'20[12]\d', date_text)
+    year_match = YEAR_RE.search(date_text)
     if year_match:
         return f"{year_match.group(0)}-01-01"
 
     return None
 
 
+def select_cards(tree) -> list:
+    """
+    Find listing cards with the first of these selectors that matches anything:
+    .card, [class*="card"], .search-result, [class*="listing"], article.
+    One pass over the candidates replaces up to five document traversals.
+    """
+    levels = [[], [], [], [], []]
+    for element in CARD_CANDIDATES_XPATH(tree):
+        class_attr = element.get('class') or ''
+        classes = class_attr.split()
+        if 'card' in class_attr:
+            if 'card' in classes:
+                levels[0].append(element)
+            levels[1].append(element)
+        if 'search-result' in classes:
+            levels[2].append(element)
+        if 'listing' in class_attr:
+            levels[3].append(element)
+        if element.tag == 'article':
+            levels[4].append(element)
+    return next((level for level in levels if level), [])
+
+
+def first_match(element, xpaths: list) -> etree._Element | None:
+    """Return the first node found by the first of xpaths that matches anything"""
+    for xpath in xpaths:
+        found = xpath(element)
+        if found:
+            return found[0]
+    return None
+
+
+def find_item_link(card) -> etree._Element | None:
+    """Return the card's first a[href*="/worthopedia/"], else its first a[href], in one walk"""
+    first_link = None
+    for link in card.iterdescendants('a'):
+        href = link.get('href')
+        if href is None:
+            continue
+        if '/worthopedia/' in href:
+            return link
+        if first_link is None:
+            first_link = link
+    return first_link
+
+
 class WorthPointScraper:
     def __init__(self, session_cookie: str, debug: bool = False):
         self.session = requests.Session()
         self.debug = debug
+        self._throttle = threading.Lock()
+        self._next_request_at = 0.0
         self.session.cookies.set('gc_session', session_cookie, domain='.worthpoint.com')
+        # One pooled keep-alive connection per worker thread; back off and retry on throttling
+        retry = Retry(total=3, backoff_factor=1.0, status_forcelist=[429, 502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=MAX_CONCURRENT_REQUESTS,
+            max_retries=retry,
+        ))
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -127,10 +258,19 @@ class WorthPointScraper:
             'Referer': 'https://www.worthpoint.com/',
         })
 
-    def search(self, query: str, offset: int = 0) -> list[dict]:
+    def wait_for_slot(self):
+        """Space request starts DELAY_BETWEEN_REQUESTS / MAX_CONCURRENT_REQUESTS apart across threads"""
+        with self._throttle:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + DELAY_BETWEEN_REQUESTS / MAX_CONCURRENT_REQUESTS
+        time.sleep(start_at - now)
+
+    def search(self, query: str, offset: int = 0) -> tuple[list[dict], int | None]:
         """
         Search WorthPoint inventory and extract listings.
-        Returns list of {title, price, date, url}
+        Returns (list of {title, price, date, url}, total result count). The
+        total is only read from the first page (offset 0); otherwise None.
 
         URL pattern: /inventory/search?offset=0&max=20&sort=SaleDate&query=...
         """
@@ -149,75 +289,82 @@ class WorthPointScraper:
             f"&saleDate=ALL_TIME"
         )
 
+        self.wait_for_slot()
         try:
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
         except requests.RequestException as e:
             print(f"  Request error: {e}")
-            return []
+            return [], None
 
         # Check if we're logged in
-        if "sign in" in response.text.lower() and "my account" not in response.text.lower():
+        # Work on the raw bytes; lxml decodes them itself, so response.text is never built
+        body = response.content
+        if SIGN_IN_RE.search(body) and not MY_ACCOUNT_RE.search(body):
             print("  WARNING: Session may have expired - check your cookie")
-            return []
+            return [], None
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+        try:
+            # Decode with the same charset response.text would have used
+            parser = lxml_html.HTMLParser(encoding=response.encoding or 'utf-8')
+            tree = lxml_html.fromstring(body, parser=parser)
+        except etree.ParserError as e:
+            print(f"  Parse error: {e}")
+            return [], None
         listings = []
 
         # Debug mode: save raw HTML for inspection
         if self.debug:
             debug_file = f"debug_response_offset{offset}.html"
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(response.text)
+            with open(debug_file, 'wb') as f:
+                f.write(body)
             print(f"\n  [DEBUG] Saved HTML to {debug_file}")
-            print(f"  [DEBUG] Response length: {len(response.text)} chars")
+            print(f"  [DEBUG] Response length: {len(body)} bytes")
+
+        total = None
+        if offset == 0:
+            total_match = TOTAL_RE.search(' '.join(TEXT_XPATH(tree)))
+            if total_match:
+                total = int(total_match.group(1).replace(',', ''))
 
         # Find all listing cards - try various selectors
-        cards = (
-            soup.select('.card') or
-            soup.select('[class*="card"]') or
-            soup.select('.search-result') or
-            soup.select('[class*="listing"]') or
-            soup.select('article')
-        )
+        cards = select_cards(tree)
 
         # Fallback: find divs containing "Sold for:" text
         if not cards:
-            for div in soup.find_all('div'):
-                text = div.get_text()
+            for div in DIV_XPATH(tree):
+                text = div.text_content()
                 if 'Sold for:' in text and 'Sold Date:' in text:
                     cards.append(div)
 
         for card in cards:
             try:
-                card_text = card.get_text(separator='\n')
+                card_text = '\n'.join(TEXT_XPATH(card))
+
+                # Without "Sold for:"/"Sold Date:" (any case) a card can't yield a listing,
+                # so skip the regexes and the title/link lookups
+                if 'Sold' not in card_text and 'sold' not in card_text.lower():
+                    continue
 
                 # Extract title - usually in h2, h3, or first link
-                title_elem = (
-                    card.select_one('h2') or
-                    card.select_one('h3') or
-                    card.select_one('h4') or
-                    card.select_one('a[href*="/worthopedia/"]') or
-                    card.select_one('.title') or
-                    card.select_one('a')
-                )
-                title = title_elem.get_text(strip=True) if title_elem else ""
+                title_elem = first_match(card, TITLE_XPATHS)
+                title = ''.join(text.strip() for text in TEXT_XPATH(title_elem)) if title_elem is not None else ""
 
                 # Extract price from "Sold for: $XX.XX" pattern
-                price_match = re.search(r'Sold\s+for:\s*\$?([\d,]+\.?\d*)', card_text, re.IGNORECASE)
+                price_match = SOLD_PRICE_RE.search(card_text)
                 price_text = price_match.group(1) if price_match else ""
 
                 # Extract date from "Sold Date: Jan 18, 2026" pattern
-                date_match = re.search(r'Sold\s+Date:\s*([A-Za-z]+\s+\d+,?\s+\d{4})', card_text, re.IGNORECASE)
+                date_match = SOLD_DATE_RE.search(card_text)
                 if not date_match:
                     # Try alternate patterns
-                    date_match = re.search(r'Sold\s+Date:\s*(\d{1,2}/\d{1,2}/\d{4})', card_text, re.IGNORECASE)
+                    date_match = SOLD_DATE_NUM_RE.search(card_text)
                 date_text = date_match.group(1) if date_match else ""
 
                 # Extract URL
-                link = card.select_one('a[href*="/worthopedia/"]') or card.select_one('a[href]')
+                link = find_item_link(card)
                 item_url = ""
-                if link and link.get('href'):
+                if link is not None and link.get('href'):
                     item_url = link.get('href')
                     if not item_url.startswith('http'):
                         item_url = f"https://www.worthpoint.com{item_url}"
@@ -234,103 +381,131 @@ class WorthPointScraper:
                 print(f"  Error parsing card: {e}")
                 continue
 
-        return listings
-
-    def scrape_material(self, slug: str, search_terms: list[str]) -> list[dict]:
-        """Scrape all listings for a material across all search terms"""
-        all_results = []
-        seen_titles = set()
+        return listings, total
 
-        for term in search_terms:
-            print(f"  Searching: '{term}'")
+    def submit_pages(self, pool: ThreadPoolExecutor, pending: deque, offsets, term: str):
+        """Top up pending with (offset, future) page fetches until MAX_CONCURRENT_REQUESTS are in flight"""
+        for offset in islice(offsets, MAX_CONCURRENT_REQUESTS - len(pending)):
+            pending.append((offset, pool.submit(self.search, term, offset)))
 
-            # Use offset-based pagination (20 items per page)
-            offset = 0
-            max_offset = MAX_PAGES_PER_MATERIAL * 20  # Convert pages to offset limit
-            consecutive_empty = 0
+    def scrape_material(self, slug: str, search_terms: list[str], writer) -> tuple[int, list[float]]:
+        """
+        Scrape all listings for a material across all search terms, writing
+        each page's rows to writer as it is processed.
+        Returns (rows written, prices per gram for the summary stats).
+        """
+        row_count = 0
+        prices_per_gram = []
+        seen_titles: set[int] = set()
+
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as pool:
+            for term in search_terms:
+                print(f"  Searching: '{term}'")
+
+                # Use offset-based pagination (20 items per page), keeping the next
+                # few pages in flight while the current one is processed. The first
+                # page is fetched alone so its result count can bound the rest
+                max_offset = MAX_PAGES_PER_MATERIAL * 20  # Convert pages to offset limit
+                offsets = iter(())
+                pending = deque([(0, pool.submit(self.search, term, 0))])
+                consecutive_empty = 0
 
-            while offset < max_offset:
-                print(f"    Offset {offset}...", end=" ")
+                while pending:
+                    offset, future = pending.popleft()
+                    self.submit_pages(pool, pending, offsets, term)
 
-                listings = self.search(term, offset)
+                    print(f"    Offset {offset}...", end=" ")
 
-                if not listings:
-                    print("no results")
-                    consecutive_empty += 1
-                    if consecutive_empty >= 2:
-                        break
-                    offset += 20
-                    time.sleep(DELAY_BETWEEN_REQUESTS)
-                    continue
+                    listings, total = future.result()
 
-                consecutive_empty = 0
-                new_count = 0
+                    if offset == 0:
+                        # Without a count, probe pages until the end-of-results checks below stop
+                        end_offset = min(total, max_offset) if total is not None else max_offset
+                        offsets = iter(range(20, end_offset, 20))
+                        self.submit_pages(pool, pending, offsets, term)
 
-                for listing in listings:
-                    # Deduplicate by title
-                    title_key = listing['title'].lower()[:50]
-                    if title_key in seen_titles:
+                    if not listings:
+                        print("no results")
+                        consecutive_empty += 1
+                        if consecutive_empty >= 2:
+                            break
                         continue
-                    seen_titles.add(title_key)
 
-                    # Parse fields
-                    price = extract_price_usd(listing['price_text'])
-                    date = parse_date(listing['date_text'])
-                    weight = extract_weight_grams(listing['title'])
+                    consecutive_empty = 0
+                    rows = []
 
-                    # Filter to 2021-2026
-                    if date:
-                        year = int(date[:4])
-                        if year < 2021 or year > 2026:
+                    for listing in listings:
+                        # Deduplicate by title, keeping only the hash of the key
+                        title_key = hash(listing['title'][:50].casefold())
+                        if title_key in seen_titles:
                             continue
+                        seen_titles.add(title_key)
+
+                        # Parse fields
+                        price = extract_price_usd(listing['price_text'])
+                        date = parse_date(listing['date_text'])
+                        weight = extract_weight_grams(listing['title'])
+
+                        # Filter to 2021-2026
+                        if date:
+                            year = int(date[:4])
+                            if year < 2021 or year > 2026:
+                                continue
+
+                        # Calculate price per gram
+                        price_per_gram = None
+                        if price and weight and weight > 0:
+                            price_per_gram = round(price / weight, 2)
+
+                        rows.append((slug, date, listing['title'], price, weight,
+                                     price_per_gram, 'WorthPoint', listing['url']))
+                        if price_per_gram:
+                            prices_per_gram.append(price_per_gram)
+
+                    writer.writerows(rows)
+                    row_count += len(rows)
+                    print(f"{len(rows)} new listings")
+
+                    # If we got fewer than 20 results, we've likely hit the end
+                    if len(listings) < 20:
+                        print(f"    End of results (got {len(listings)} < 20)")
+                        break
 
-                    # Calculate price per gram
-                    price_per_gram = None
-                    if price and weight and weight > 0:
-                        price_per_gram = round(price / weight, 2)
-
-                    all_results.append({
-                        'material_slug': slug,
-                        'sale_date': date,
-                        'title': listing['title'],
-                        'price_usd': price,
-                        'weight_grams': weight,
-                        'price_per_gram': price_per_gram,
-                        'source': 'WorthPoint',
-                        'url': listing['url'],
-                    })
-                    new_count += 1
-
-                print(f"{new_count} new listings")
-
-                # If we got fewer than 20 results, we've likely hit the end
-                if len(listings) < 20:
-                    print(f"    End of results (got {len(listings)} < 20)")
-                    break
+                    # A full page at the counted end means the count was stale; keep probing
+                    if not pending:
+                        offsets = iter(range(offset + 20, max_offset, 20))
+                        self.submit_pages(pool, pending, offsets, term)
 
-                offset += 20
-                time.sleep(DELAY_BETWEEN_REQUESTS)
+                # Pages fetched past the end of results are discarded
+                for _, future in pending:
+                    future.cancel()
 
-        return all_results
+        return row_count, prices_per_gram
 
-    def save_csv(self, slug: str, data: list[dict]):
-        """Save results to CSV file"""
-        if not data:
-            print(f"  No data to save for {slug}")
-            return
-
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
+    @contextlib.contextmanager
+    def open_csv_writer(self, slug: str):
+        """
+        Yield a csv.writer for the material's CSV so rows are written as scraped.
+        Rows go to a .part file that replaces the CSV once scraping finishes; a
+        scrape with no rows leaves any existing CSV untouched.
+        """
         filepath = os.path.join(OUTPUT_DIR, f"{slug}.csv")
+        part_path = filepath + ".part"
 
         fieldnames = ['material_slug', 'sale_date', 'title', 'price_usd',
                       'weight_grams', 'price_per_gram', 'source', 'url']
 
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(data)
+        with open(part_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            header_end = f.tell()
+            yield writer
+            has_rows = f.tell() > header_end
 
-        print(f"  Saved {len(data)} listings to {filepath}")
+        if has_rows:
+            os.replace(part_path, filepath)
+        else:
+            os.remove(part_path)
 
 
 def test_connection(scraper: WorthPointScraper) -> bool:
@@ -355,11 +530,13 @@ def main():
     parser.add_argument('--material', help='Scrape single material (slug name)')
     parser.add_argument('--test', action='store_true', help='Test connection only')
     parser.add_argument('--delay', type=int, default=3, help='Delay between requests (seconds)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Search pages fetched in parallel')
     parser.add_argument('--debug', action='store_true', help='Save raw HTML for debugging selectors')
     args = parser.parse_args()
 
-    global DELAY_BETWEEN_REQUESTS
+    global DELAY_BETWEEN_REQUESTS, MAX_CONCURRENT_REQUESTS
     DELAY_BETWEEN_REQUESTS = args.delay
+    MAX_CONCURRENT_REQUESTS = max(1, args.concurrency)
 
     scraper = WorthPointScraper(args.cookie, debug=args.debug)
 
@@ -380,23 +557,28 @@ def main():
     else:
         materials_to_scrape = MATERIALS
 
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
     # Scrape each material
     for slug, search_terms in materials_to_scrape.items():
         print(f"\n{'='*50}")
         print(f"Scraping: {slug}")
         print(f"{'='*50}")
 
-        results = scraper.scrape_material(slug, search_terms)
-        scraper.save_csv(slug, results)
+        with scraper.open_csv_writer(slug) as writer:
+            row_count, prices = scraper.scrape_material(slug, search_terms, writer)
+
+        if row_count:
+            print(f"  Saved {row_count} listings to {os.path.join(OUTPUT_DIR, f'{slug}.csv')}")
+        else:
+            print(f"  No data to save for {slug}")
 
         # Summary stats
-        if results:
-            prices = [r['price_per_gram'] for r in results if r['price_per_gram']]
-            if prices:
-                avg = sum(prices) / len(prices)
-                median = sorted(prices)[len(prices) // 2]
-                print(f"  Stats: {len(prices)} with weight data")
-                print(f"  Average: ${avg:.2f}/gram, Median: ${median:.2f}/gram")
+        if prices:
+            avg = sum(prices) / len(prices)
+            median = statistics.median_high(prices)
+            print(f"  Stats: {len(prices)} with weight data")
+            print(f"  Average: ${avg:.2f}/gram, Median: ${median:.2f}/gram")
 
         # Longer delay between materials
         time.sleep(DELAY_BETWEEN_REQUESTS * 2)